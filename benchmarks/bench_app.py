@@ -0,0 +1,101 @@
+"""Startup and rerun budgets for the Streamlit app.
+
+Runs snake_game.py headless through Streamlit's AppTest and checks two
+times against their budgets:
+
+    python benchmarks/bench_app.py               # measure and check
+    python benchmarks/bench_app.py --reruns 200  # more reruns for a steadier median
+
+`startup` is the first run of the script in a fresh interpreter that has
+already imported Streamlit: our imports, the page setup, the shared map
+pool and the first frame. `rerun` is the median time to run the whole
+script again afterwards, which every click and every game tick pays. Both
+include AppTest's own overhead. The exit status is 1 when either is over
+budget, so the check can gate CI like bench_engine.py.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "snake_game.py")
+
+# Milliseconds, with headroom over a typical run
+STARTUP_BUDGET_MS = 1000
+RERUN_BUDGET_MS = 100
+
+_FIRST_RUN = """
+import sys, time
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file(sys.argv[1], default_timeout=60)
+start = time.perf_counter()
+app.run()
+assert not app.exception, app.exception
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def measure_startup(runs):
+    """Milliseconds of each first run, one fresh interpreter per run"""
+    times = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", _FIRST_RUN, APP], capture_output=True, text=True,
+                             check=True)
+        times.append(float(out.stdout.split()[-1]))
+    return times
+
+
+def measure_reruns(reruns):
+    """Milliseconds of each rerun after a first run in this process"""
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(APP, default_timeout=60)
+    app.run()
+    times = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        app.run()
+        times.append((time.perf_counter() - start) * 1000)
+    if app.exception:
+        raise RuntimeError(f"the app failed: {app.exception}")
+    return times
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--starts", type=int, default=5, help="fresh interpreters to time the first run in")
+    parser.add_argument("--reruns", type=int, default=50)
+    parser.add_argument("--startup-budget", type=float, default=STARTUP_BUDGET_MS, help="milliseconds")
+    parser.add_argument("--rerun-budget", type=float, default=RERUN_BUDGET_MS, help="milliseconds")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = {}
+    over = []
+    print(f"{'measure':12} {'median':>10} {'min':>10} {'budget':>10}")
+    for name, times, budget in (
+            ("startup", measure_startup(args.starts), args.startup_budget),
+            ("rerun", measure_reruns(args.reruns), args.rerun_budget)):
+        median = statistics.median(times)
+        results[name] = {'median_ms': round(median, 1), 'min_ms': round(min(times), 1),
+                         'budget_ms': budget}
+        flag = ""
+        if median > budget:
+            over.append(name)
+            flag = " !"
+        print(f"{name:12} {median:>8.1f}ms {min(times):>8.1f}ms {budget:>8.0f}ms{flag}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if over:
+        print(f"over budget: {', '.join(over)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+"""Benchmarks for the engine hot paths.
+
+Runs every hot path over a matrix of grid sizes, snake lengths and obstacle
+densities, prints ops/sec and peak memory per scenario, and compares the
+results to a stored baseline:
+
+    python benchmarks/bench_engine.py                  # run and compare
+    python benchmarks/bench_engine.py --save-baseline  # record a new baseline
+    python benchmarks/bench_engine.py -k render        # only matching scenarios
+
+The exit status is 1 when any scenario is slower than its baseline by more
+than the tolerance, so the suite can gate CI.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from snake_engine import (  # noqa: E402
+    OBSTACLE_COUNT, SnakeGame, generate_map, RIGHT
+)
+from snake_ai import FieldEscape  # noqa: E402
+from snake_bots import Autopilot, ring_cycle  # noqa: E402
+from snake_render import GridRenderer  # noqa: E402
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+GRID_SIZES = (30, 100, 500)
+SNAKE_LENGTHS = (3, 100, 1000)
+NO_LANDSCAPE = {'mountain': 0, 'tree': 0, 'house': 0, 'water': 0}
+DENSITIES = {
+    'default': OBSTACLE_COUNT,
+    'dense': {kind: count * 8 for kind, count in OBSTACLE_COUNT.items()}
+}
+
+
+def snake_on_cycle(size, length, human_policy=None):
+    """A game on an empty map whose snake lies along ring_cycle"""
+    cycle = ring_cycle(size)
+    game = SnakeGame(human_policy=human_policy,
+                     game_map=generate_map(1, size, NO_LANDSCAPE))
+    state = game.get_state()
+    state['snake'] = cycle[length - 1::-1]
+    state['human'] = None
+    state['direction'] = RIGHT
+    game.set_state(state)
+
+    # Direction to take from each cell to stay on the cycle
+    steer = {}
+    for here, there in zip(cycle, cycle[1:] + cycle[:1]):
+        steer[here] = (there[0] - here[0], there[1] - here[1])
+    return game, steer
+
+
+def bench_move_snake(size, length):
+    game, steer = snake_on_cycle(size, length)
+
+    def run(n):
+        move = game.move_snake
+        for _ in range(n):
+            game.direction = steer[game.snake.head]
+            move()
+        assert not game.game_over
+    return run
+
+
+def bench_move_human(size, length, policy):
+    game, _ = snake_on_cycle(size, length, FieldEscape() if policy == 'field' else None)
+    game.place_human(game.generate_human())
+
+    def run(n):
+        start = game.human
+        for _ in range(n):
+            game.move_human()
+            game.place_human(start)
+            game.ticks += 1  # a new tick, so cached fields are rebuilt
+    return run
+
+
+def bench_generate_landscape(size, density):
+    counts = DENSITIES[density]
+
+    def run(n):
+        for seed in range(n):
+            generate_map(seed, size, counts)
+    return run
+
+
+def bench_generate_human(size, density):
+    game = SnakeGame(size, DENSITIES[density], seed=1)
+
+    def run(n):
+        generate = game.generate_human
+        for _ in range(n):
+            generate()
+    return run
+
+
+def bench_render(size, length):
+    game, steer = snake_on_cycle(size, length)
+    renderer = GridRenderer()
+    renderer.render(game)
+
+    def run(n):
+        for _ in range(n):
+            game.direction = steer[game.snake.head]
+            game.move_snake()
+            renderer.render(game)
+    return run
+
+
+def bench_autopilot(size):
+    game = SnakeGame(size, seed=1)
+    autopilot = Autopilot()
+
+    def run(n):
+        step = game.step
+        choose = autopilot.choose
+        for _ in range(n):
+            if step(choose(game)):
+                game.reset(game.seed)
+    return run
+
+
+def bench_render_cold(size):
+    game = SnakeGame(size, seed=1)
+
+    def run(n):
+        for _ in range(n):
+            GridRenderer().render(game)
+    return run
+
+
+def scenarios():
+    """(name, unit, factory) for every point of the matrix"""
+    for size in GRID_SIZES:
+        for length in SNAKE_LENGTHS:
+            if length >= (size - 2) ** 2:
+                continue
+            yield f"move_snake[{size}, len={length}]", "ticks", lambda s=size, l=length: bench_move_snake(s, l)
+            yield f"render_frame[{size}, len={length}]", "frames", lambda s=size, l=length: bench_render(s, l)
+        for policy in ('greedy', 'field'):
+            yield f"move_human[{size}, {policy}]", "calls", lambda s=size, p=policy: bench_move_human(s, 3, p)
+        for density in DENSITIES:
+            yield (f"generate_landscape[{size}, {density}]", "maps",
+                   lambda s=size, d=density: bench_generate_landscape(s, d))
+            yield (f"generate_human[{size}, {density}]", "calls",
+                   lambda s=size, d=density: bench_generate_human(s, d))
+        yield f"render_cold[{size}]", "frames", lambda s=size: bench_render_cold(s)
+        yield f"autopilot[{size}]", "ticks", lambda s=size: bench_autopilot(s)
+
+
+def measure(factory, seconds):
+    """Ops/sec of the scenario, and peak memory allocated while it runs.
+
+    Memory is traced in a separate, shorter run after setup, so it reflects
+    the hot path itself rather than building the scenario.
+    """
+    run = factory()
+    run(1)  # warm up
+    n, elapsed = 1, 0.0
+    while elapsed < seconds / 4:
+        n *= 2
+        start = time.perf_counter()
+        run(n)
+        elapsed = time.perf_counter() - start
+    rate = n / elapsed
+
+    run = factory()
+    tracemalloc.start()
+    run(max(1, n // 8))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return rate, peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-k", "--filter", default="", help="only run scenarios containing this text")
+    parser.add_argument("--seconds", type=float, default=1.0, help="target time per scenario")
+    parser.add_argument("--tolerance", type=float, default=0.30,
+                        help="allowed slowdown against the baseline (fraction)")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressions = []
+    print(f"{'scenario':44} {'rate':>14} {'baseline':>14} {'change':>8} {'peak mem':>10}")
+    for name, unit, factory in scenarios():
+        if args.filter not in name:
+            continue
+        rate, peak = measure(factory, args.seconds)
+        results[name] = {'rate': round(rate, 1), 'unit': unit, 'peak_bytes': peak}
+
+        before = baseline.get(name, {}).get('rate')
+        change = f"{rate / before - 1:+.0%}" if before else "new"
+        if before and rate < before * (1 - args.tolerance):
+            regressions.append(name)
+            change += " !"
+        print(f"{name:44} {rate:>9.0f} {unit:>4} {before or 0:>14.0f} {change:>8} {peak / 1024:>8.0f}KB")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.save_baseline:
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+import numpy as np
+
+from snake_engine import EMPTY, SNAKE_HEAD
+
+# Distance given to cells the bounded search did not reach
+FAR = 1 << 15
+
+# Window bytes for cells the snake cannot enter, and has not reached yet
+BLOCKED = 254
+UNREACHED = 255
+
+
+class DistanceField:
+    """Path distances from the snake head over the occupancy grid.
+
+    A breadth-first search from the head through every cell the snake could
+    enter, stopping at `radius` steps. Those cells all lie in the square of
+    side `2 * radius + 1` around the head, so the search runs on a copy of
+    just that window with one byte per cell: blocked, not reached yet, or
+    the distance. The cost of one update is bounded by the radius rather
+    than by the grid size. Cells outside the radius report `FAR`.
+    """
+
+    def __init__(self, radius=12):
+        if not 0 <= radius < BLOCKED:
+            raise ValueError(f"radius must be below {BLOCKED}")
+        self.radius = radius
+        self.span = 2 * radius + 1
+        self.dist = bytearray([BLOCKED]) * (self.span * self.span)
+        self.origin = (0, 0)
+        self.key = None
+
+    def update(self, game):
+        """Recompute the field for the current tick of `game` if needed"""
+        key = (game.game_id, game.ticks, game.snake.head)
+        if key == self.key:
+            return self
+        self.key = key
+
+        size = game.grid_size
+        radius = self.radius
+        span = self.span
+        head_x, head_y = game.snake.head
+        x0, y0 = self.origin = (head_x - radius, head_y - radius)
+
+        # Copy the window, clipped to the grid, as blocked/unreached bytes
+        window = np.full((span, span), BLOCKED, dtype=np.uint8)
+        gx0, gy0 = max(x0, 0), max(y0, 0)
+        gx1, gy1 = min(x0 + span, size), min(y0 + span, size)
+        window[gy0 - y0:gy1 - y0, gx0 - x0:gx1 - x0] = np.where(
+            game.grid[gy0:gy1, gx0:gx1] < SNAKE_HEAD, UNREACHED, BLOCKED)
+        dist = self.dist
+        dist[:] = window.tobytes()
+        centre = radius * span + radius
+        dist[centre] = 0
+        last_row = span * (span - 1)
+
+        # Expand one distance level at a time up to the radius
+        level = [centre]
+        for d in range(1, radius + 1):
+            following = []
+            for index in level:
+                x = index % span
+                if index >= span:
+                    n = index - span
+                    if dist[n] == UNREACHED:
+                        dist[n] = d
+                        following.append(n)
+                if index < last_row:
+                    n = index + span
+                    if dist[n] == UNREACHED:
+                        dist[n] = d
+                        following.append(n)
+                if x > 0:
+                    n = index - 1
+                    if dist[n] == UNREACHED:
+                        dist[n] = d
+                        following.append(n)
+                if x < span - 1:
+                    n = index + 1
+                    if dist[n] == UNREACHED:
+                        dist[n] = d
+                        following.append(n)
+            if not following:
+                break
+            level = following
+        return self
+
+    def distance(self, pos):
+        dx = pos[0] - self.origin[0]
+        dy = pos[1] - self.origin[1]
+        if 0 <= dx < self.span and 0 <= dy < self.span:
+            d = self.dist[dy * self.span + dx]
+            if d < BLOCKED:
+                return d
+        return FAR
+
+
+class FieldEscape:
+    """Human escape policy that flees by path distance, not straight lines.
+
+    Candidate moves are ranked by their distance in the shared
+    DistanceField, with squared straight-line distance as the tie-breaker
+    (which is all that is left once the snake is outside the search
+    radius). As with the greedy policy the human never moves closer. One
+    field is built per tick and reused for every human asking about it.
+    """
+
+    def __init__(self, radius=12):
+        self.field = DistanceField(radius)
+
+    def choose(self, game, pos):
+        """Best escape cell next to `pos`, or None to stay put"""
+        field = self.field.update(game)
+        size = game.grid_size
+        grid = game.grid
+        head_x, head_y = game.snake.head
+
+        def score(cell):
+            dx, dy = head_x - cell[0], head_y - cell[1]
+            return (field.distance(cell), dx*dx + dy*dy)
+
+        current = score(pos)
+        best, best_score = None, None
+        for dx, dy in ((0, 1), (1, 0), (0, -1), (-1, 0)):
+            cell = (pos[0] + dx, pos[1] + dy)
+            if (0 < cell[0] < size-1 and 0 < cell[1] < size-1 and
+                    grid[cell[1], cell[0]] == EMPTY):
+                cell_score = score(cell)
+                if cell_score >= current and (best is None or cell_score > best_score):
+                    best, best_score = cell, cell_score
+        return best
+
+    def choose_many(self, game, positions):
+        """Escape moves for several humans sharing this tick's field"""
+        return [self.choose(game, pos) for pos in positions]
@@ -0,0 +1,166 @@
+from collections import Counter
+
+from snake_engine import (
+    SnakeGame, SnakeBody, GRID_SIZE, INITIAL_SNAKE_LENGTH, CATCH_REWARD, WIN_SCORE,
+    RIGHT, EMPTY, SNAKE_HEAD, SNAKE_BODY, COLLISION_CAUSES
+)
+
+
+class ArenaGame(SnakeGame):
+    """Several snakes on one map, competing for the same villager.
+
+    Builds on SnakeGame for the map, grid, change log and villager. Every
+    player has their own body, direction and score in `snakes`,
+    `directions` and `scores`, keyed by player id, and all snakes move at
+    once on each `step`:
+
+    - a snake whose new head is blocked dies (tails still block, as in
+      SnakeGame), and so do heads meeting in the same cell;
+    - the snake reaching the villager scores and grows;
+    - dead snakes are removed from the board, with their cause of death
+      kept in `causes`.
+
+    The game is won when a snake reaches WIN_SCORE (`winner`) and over when
+    no snake is left. The villager flees from the nearest head. Arena games
+    have no get_state/set_state support, so replays and snapshots refuse
+    them up front.
+    """
+
+    __slots__ = ('players', 'snakes', 'directions', 'scores', 'causes', 'winner')
+
+    def __init__(self, players, grid_size=GRID_SIZE, obstacle_count=None, seed=None,
+                 record_changes=False, human_policy=None, game_map=None):
+        self.players = list(players)
+        super().__init__(grid_size, obstacle_count, seed, record_changes, human_policy, game_map)
+
+    def reset(self, seed=None, game_map=None):
+        super().reset(seed, game_map)
+
+        # Take the single-player snake off the board again. Cells go through
+        # set_cell so the free-cell index, if reset already built it, stays
+        # in step with the grid
+        for x, y in self.snake:
+            self.set_cell(x, y, EMPTY)
+
+        self.snakes = {}
+        self.directions = {}
+        self.scores = {player: 0 for player in self.players}
+        self.causes = {}
+        self.winner = None
+        for i, player in enumerate(self.players):
+            cells = self._spawn(i)
+            if cells is None:
+                self.causes[player] = 'no room'
+                continue
+            self.snakes[player] = SnakeBody(cells, self.grid_size)
+            self.directions[player] = RIGHT
+            head_x, head_y = cells[0]
+            self.set_cell(head_x, head_y, SNAKE_HEAD)
+            for x, y in cells[1:]:
+                self.set_cell(x, y, SNAKE_BODY)
+        self.game_over = not self.snakes
+        self.snake = next(iter(self.snakes.values()), self.snake)
+        return self
+
+    def _spawn(self, index):
+        """Cells of a horizontal starting snake for the `index`-th player.
+
+        Players are spread over evenly spaced rows; the nearest row with a
+        run of empty cells long enough for the body and a first free move
+        is used. Returns None when no row has room.
+        """
+        size = self.grid_size
+        length = INITIAL_SNAKE_LENGTH
+        target = (index + 1) * size // (len(self.players) + 1)
+        grid = self.grid
+        for y in sorted(range(1, size - 1), key=lambda row: abs(row - target)):
+            run = 0
+            for x in range(1, size - 1):
+                run = run + 1 if grid[y, x] == EMPTY else 0
+                if run > length:
+                    return [(x - 1 - i, y) for i in range(length)]
+        return None
+
+    def steer(self, player, direction):
+        """Turn one player's snake, ignoring 180-degree reversals"""
+        current = self.directions.get(player)
+        if current is not None and (direction[0] != -current[0] or direction[1] != -current[1]):
+            self.directions[player] = direction
+
+    def move_snake(self):
+        """Advance every snake one cell and resolve collisions and catches"""
+        if self.paused or self.game_over or self.win:
+            return
+
+        size = self.grid_size
+        grid = self.grid
+        moves = {}
+        for player, snake in self.snakes.items():
+            head_x, head_y = snake.head
+            dx, dy = self.directions[player]
+            moves[player] = (head_x + dx, head_y + dy)
+        targets = Counter(moves.values())
+
+        for player, (x, y) in list(moves.items()):
+            if not (0 <= x < size and 0 <= y < size):
+                cause = 'wall'
+            elif grid[y, x] >= SNAKE_HEAD:
+                cause = COLLISION_CAUSES[grid[y, x]]
+            elif targets[(x, y)] > 1:
+                cause = 'head-on'
+            else:
+                continue
+            self.causes[player] = cause
+            del moves[player]
+        for player in self.causes.keys() & self.snakes.keys():
+            for x, y in self.snakes.pop(player):
+                self.set_cell(x, y, EMPTY)
+
+        caught = False
+        for player, new_head in moves.items():
+            snake = self.snakes[player]
+            head = snake.head
+            snake.push_head(new_head)
+            self.set_cell(head[0], head[1], SNAKE_BODY)
+            self.set_cell(new_head[0], new_head[1], SNAKE_HEAD)
+            if new_head == self.human:
+                caught = True
+                self.scores[player] += CATCH_REWARD
+                if self.scores[player] >= WIN_SCORE:
+                    self.win = True
+                    self.winner = player
+            else:
+                tail = snake.pop_tail()
+                self.set_cell(tail[0], tail[1], EMPTY)
+        self.ticks += 1
+        self.score = max(self.scores.values(), default=0)
+
+        if not self.snakes:
+            self.game_over = True
+            self.cause = 'eliminated'
+            return
+        if self.win:
+            return
+        if caught:
+            self.place_human(self.generate_human())
+            return
+
+        # The villager runs from whichever head is closest
+        if self.human:
+            hx, hy = self.human
+            self.snake = min(self.snakes.values(),
+                             key=lambda s: (s.head[0] - hx) ** 2 + (s.head[1] - hy) ** 2)
+        self.move_human()
+
+    def step(self, actions=None):
+        """Apply `{player: direction}` and advance one tick; returns `done`"""
+        for player, direction in (actions or {}).items():
+            self.steer(player, direction)
+        self.move_snake()
+        return self.done
+
+    def get_state(self):
+        raise TypeError("arena games cannot be recorded or snapshotted")
+
+    def set_state(self, state):
+        raise TypeError("arena games cannot be recorded or snapshotted")
@@ -0,0 +1,255 @@
+from collections import deque
+
+from snake_engine import EMPTY, SNAKE_HEAD, SNAKE_BODY, UP, DOWN, LEFT, RIGHT
+
+# Order in which bots try moves; earlier directions win ties
+MOVES = (UP, DOWN, LEFT, RIGHT)
+
+
+def safe_moves(game):
+    """(direction, cell) for every move that does not crash this tick"""
+    size = game.grid_size
+    grid = game.grid
+    head_x, head_y = game.snake.head
+    moves = []
+    for dx, dy in MOVES:
+        x, y = head_x + dx, head_y + dy
+        if 0 <= x < size and 0 <= y < size and grid[y, x] < SNAKE_HEAD:
+            moves.append(((dx, dy), (x, y)))
+    return moves
+
+
+def shortest_path(game, goal, blocked=SNAKE_HEAD):
+    """Cells from the head (excluded) to `goal` along a shortest path.
+
+    A breadth-first search over every cell with a code below `blocked`;
+    on a grid where all steps cost the same it finds the same paths as A*
+    with less bookkeeping. Returns None when `goal` cannot be reached.
+    """
+    return grid_path(game.grid, game.snake.head, goal, blocked)
+
+
+def grid_path(grid, start, goal, blocked=SNAKE_HEAD):
+    """shortest_path between any two cells of an occupancy grid.
+
+    `goal` itself may hold any code, e.g. the snake's own tail.
+    """
+    size = grid.shape[0]
+    cells = memoryview(grid.reshape(-1))
+    start = start[1] * size + start[0]
+    target = goal[1] * size + goal[0]
+    parent = {start: start}
+    last_row = size * (size - 1)
+
+    level = [start]
+    while level and target not in parent:
+        following = []
+        for index in level:
+            x = index % size
+            # The boundary has gaps, so neighbours are bounds-checked
+            neighbours = []
+            if index >= size:
+                neighbours.append(index - size)
+            if index < last_row:
+                neighbours.append(index + size)
+            if x > 0:
+                neighbours.append(index - 1)
+            if x < size - 1:
+                neighbours.append(index + 1)
+            for n in neighbours:
+                if n not in parent and (cells[n] < blocked or n == target):
+                    parent[n] = index
+                    following.append(n)
+        level = following
+
+    if target not in parent:
+        return None
+    path = []
+    while target != start:
+        path.append((target % size, target // size))
+        target = parent[target]
+    path.reverse()
+    return path
+
+
+def ring_cycle(size):
+    """A cycle through every interior cell of an even-sized grid.
+
+    Runs along the top interior row, zig-zags down through the remaining
+    columns and returns up the first column, so a snake following it never
+    reverses or runs into itself.
+    """
+    lo, hi = 1, size - 2
+    cycle = [(x, lo) for x in range(lo, hi + 1)]
+    for row, y in enumerate(range(lo + 1, hi + 1)):
+        xs = range(hi, lo, -1) if row % 2 == 0 else range(lo + 1, hi + 1)
+        cycle.extend((x, y) for x in xs)
+    cycle.extend((lo, y) for y in range(hi, lo, -1))
+    return cycle
+
+
+def greedy_move(game):
+    """The safe move closest to the villager by Manhattan distance"""
+    moves = safe_moves(game)
+    if not moves:
+        return None
+    if not game.human:
+        return moves[0][0]
+    hx, hy = game.human
+    return min(moves, key=lambda move: abs(move[1][0] - hx) + abs(move[1][1] - hy))[0]
+
+
+class GreedyBot:
+    """Steps towards the villager, avoiding instant crashes"""
+
+    name = 'greedy'
+
+    def choose(self, game):
+        return greedy_move(game)
+
+
+class PathBot:
+    """Follows a shortest path to the villager, recomputed every tick"""
+
+    name = 'path'
+
+    def choose(self, game):
+        if game.human:
+            path = shortest_path(game, game.human)
+            if path:
+                head_x, head_y = game.snake.head
+                return (path[0][0] - head_x, path[0][1] - head_y)
+        return greedy_move(game)
+
+
+class CycleBot:
+    """Follows a Hamiltonian cycle of the interior, cutting corners to the villager.
+
+    Landscape cells lie on the cycle too, so the bot takes the free
+    neighbour that comes first along it, skipping ahead around obstacles.
+    Gaps in the boundary are off the cycle and never entered. While the
+    snake is short it may jump ahead along the cycle towards the villager,
+    as long as it stays behind its own tail.
+    On an empty board that never crashes; with landscape it usually
+    survives but can still trap itself.
+    """
+
+    name = 'cycle'
+
+    def __init__(self):
+        self.size = None
+        self.order = {}
+
+    def choose(self, game):
+        if game.grid_size != self.size:
+            self.size = game.grid_size
+            self.order = {cell: i for i, cell in enumerate(ring_cycle(self.size))}
+        order = self.order
+        here = order.get(game.snake.head)
+        moves = [move for move in safe_moves(game) if move[1] in order]
+        if here is None or not moves:
+            return greedy_move(game)
+        length = len(order)
+        ahead = {move: (order[move[1]] - here) % length for move in moves}
+
+        # Shortcut towards the villager while staying behind the tail
+        tail = order.get(game.snake.tail)
+        if game.human and tail is not None and len(game.snake) < length // 2:
+            target = (order[game.human] - here) % length
+            limit = (tail - here) % length
+            shortcuts = [move for move in moves if ahead[move] <= target and ahead[move] < limit]
+            if shortcuts:
+                return max(shortcuts, key=ahead.get)[0]
+        return min(moves, key=ahead.get)[0]
+
+
+
+class Autopilot:
+    """Chases the villager along a cached shortest path.
+
+    The path is planned once and then followed cell by cell, so most ticks
+    cost a few comparisons. When the villager steps to a neighbouring cell
+    while still far away, the path is extended by that step instead of
+    searched again. It is replanned when the villager jumps (a catch and
+    respawn), when an extended path gets within the snake's length of its
+    end, when the game is reset or the next cell is no longer free. Before a path
+    is taken a second search checks that, with its body laid along the
+    path, the snake could still reach its own tail from the villager's
+    cell. When it could not, or the villager is out of reach, the snake
+    follows its tail instead of walling itself in.
+
+    `replans` counts the searches, e.g. to compare with the ticks played.
+    """
+
+    name = 'autopilot'
+
+    def __init__(self):
+        self.path = deque()  # cells still to enter, the next one last
+        self.goal = None
+        self.game_id = None
+        self.extended = False
+        self.replans = 0
+
+    def choose(self, game):
+        head = game.snake.head
+        path = self.path
+        if path and path[-1] == head:
+            path.pop()
+        if path and self.game_id == game.game_id and self.goal != game.human:
+            self._follow(game)
+        if not (path and self.game_id == game.game_id and self.goal == game.human
+                and self._can_enter(game, path[-1])
+                and not (self.extended and len(path) <= len(game.snake))):
+            self._plan(game)
+            path = self.path
+        if not path:
+            return greedy_move(game)
+        return (path[-1][0] - head[0], path[-1][1] - head[1])
+
+    def _can_enter(self, game, cell):
+        head_x, head_y = game.snake.head
+        x, y = cell
+        return abs(x - head_x) + abs(y - head_y) == 1 and game.grid[y, x] < SNAKE_HEAD
+
+    def _follow(self, game):
+        """Extend the path by the villager's last step when that is safe to do"""
+        if self.goal is None or not game.human or len(self.path) <= len(game.snake):
+            return
+        (gx, gy), (hx, hy) = self.goal, game.human
+        if abs(hx - gx) + abs(hy - gy) == 1:
+            self.path.appendleft(game.human)
+            self.goal = game.human
+            self.extended = True
+
+    def _plan(self, game):
+        self.replans += 1
+        self.game_id = game.game_id
+        self.goal = game.human
+        self.extended = False
+        self.path = deque()
+        if game.human:
+            path = shortest_path(game, game.human)
+            if path and self._tail_reachable(game, path):
+                path.reverse()
+                self.path.extend(path)
+                return
+
+        # Stall by following the tail; replanned on the next tick
+        self.goal = None
+        to_tail = grid_path(game.grid, game.snake.head, game.snake.tail)
+        if to_tail and len(to_tail) > 1:
+            self.path.append(to_tail[0])
+
+    def _tail_reachable(self, game, path):
+        """Whether the snake could reach its tail after eating at the end of `path`"""
+        snake = list(game.snake)
+        body = (path[::-1] + snake)[:len(snake) + 1]
+        grid = game.grid.copy()
+        for x, y in snake:
+            grid[y, x] = EMPTY
+        for x, y in body:
+            grid[y, x] = SNAKE_BODY
+        return grid_path(grid, body[0], body[-1]) is not None
+
+
+BOTS = {bot.name: bot for bot in (GreedyBot, PathBot, CycleBot, Autopilot)}
@@ -0,0 +1,41 @@
+import os
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+from snake_frames import full_frame, patch_frame
+
+_FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "snake_canvas_frontend")
+_component = components.declare_component("snake_canvas", path=_FRONTEND_DIR)
+
+CELL_PX = 20
+
+
+def canvas_board(game, sync, key="snake_canvas"):
+    """Draw `game` on a canvas in the browser, sending only what changed.
+
+    The browser keeps its own copy of the board. The first render of a game
+    sends every cell code once; after that each rerun only sends the cells
+    the engine changed (old tail, new head, human move) as a flat
+    `[index, code, index, code, ...]` list. `game` must record changes.
+
+    `sync` is a dict kept in session state between reruns. It remembers
+    which game and sequence number the browser has. Patches carry the
+    sequence number they apply on top of, and the browser asks for a full
+    frame whenever it sees a gap, e.g. after a page reload.
+    """
+    # The browser reports a gap by bumping its resync counter
+    value = st.session_state.get(key)
+    resync = value.get('resync', 0) if value else 0
+    changes = game.drain_changes()
+
+    if sync.get('game_id') != game.game_id or resync != sync.get('resync_seen', 0):
+        sync['seq'] = sync.get('seq', 0) + 1
+        frame = full_frame(game, sync['seq'])
+        sync['game_id'] = game.game_id
+        sync['resync_seen'] = resync
+    else:
+        frame = patch_frame(changes, game.grid_size, sync['seq'])
+        sync['seq'] = frame['seq']
+
+    _component(frame=frame, cell_px=CELL_PX, key=key, default=None)
@@ -0,0 +1,1011 @@
+import random
+from array import array
+from functools import lru_cache
+from itertools import count
+
+import numpy as np
+
+# Game constants
+GRID_SIZE = 30
+INITIAL_SNAKE_LENGTH = 3
+MOVE_INTERVAL = 0.2  # seconds
+WIN_SCORE = 20
+CATCH_REWARD = 5
+OBSTACLE_COUNT = {
+    'mountain': 5,
+    'tree': 15,
+    'house': 8,
+    'water': 10
+}
+
+# Directions as (dx, dy)
+UP = (0, -1)
+DOWN = (0, 1)
+LEFT = (-1, 0)
+RIGHT = (1, 0)
+
+# Occupancy grid cell codes. Every code from SNAKE_HEAD upwards blocks the
+# snake; the human may only step onto EMPTY cells.
+EMPTY = 0
+HUMAN = 1
+SNAKE_HEAD = 2
+SNAKE_BODY = 3
+BOUNDARY = 4
+MOUNTAIN = 5
+TREE = 6
+HOUSE = 7
+WATER = 8
+
+# Renderers key their static-layer caches on the map; views that patch the
+# board need to know when a game was reset
+_map_ids = count(1)
+_game_ids = count(1)
+
+LANDSCAPE_CODES = {
+    'mountains': MOUNTAIN,
+    'trees': TREE,
+    'houses': HOUSE,
+    'water': WATER
+}
+
+# What ended a game, by the code of the cell the snake ran into
+COLLISION_CAUSES = {
+    SNAKE_HEAD: 'self',
+    SNAKE_BODY: 'self',
+    BOUNDARY: 'wall',
+    MOUNTAIN: 'mountain',
+    TREE: 'tree',
+    HOUSE: 'house',
+    WATER: 'water'
+}
+
+
+@lru_cache(maxsize=None)
+def boundary_obstacles(grid_size=GRID_SIZE):
+    """Boundary cells for a grid, leaving every third cell open as a gap"""
+    obstacles = []
+    for i in range(grid_size):
+        if i % 3 != 0:  # Leave some gaps for moving
+            obstacles.extend([
+                (i, 0),              # Top boundary
+                (i, grid_size-1),    # Bottom boundary
+                (0, i),              # Left boundary
+                (grid_size-1, i)     # Right boundary
+            ])
+    return tuple(obstacles)
+
+
+@lru_cache(maxsize=None)
+def boundary_grid(grid_size=GRID_SIZE):
+    """Read-only occupancy grid holding only the boundary cells"""
+    grid = np.zeros((grid_size, grid_size), dtype=np.uint8)
+    for x, y in boundary_obstacles(grid_size):
+        grid[y, x] = BOUNDARY
+    grid.flags.writeable = False
+    return grid
+
+
+@lru_cache(maxsize=None)
+def mountain_band(grid_size=GRID_SIZE):
+    """Packed cells of the two rings just inside the boundary, where mountains go"""
+    band = np.zeros((grid_size, grid_size), dtype=bool)
+    edges = [1, 2, grid_size-3, grid_size-2]
+    band[1:grid_size-1, edges] = True
+    band[edges, 1:grid_size-1] = True
+    cells = np.flatnonzero(band)
+    cells.flags.writeable = False
+    return cells
+
+
+class FreeCells:
+    """Set of packed `y*G+x` cells with O(1) add, remove and uniform sampling.
+
+    Cells live in an array with a second array from cell to its slot in
+    the first (-1 when absent), sized for `capacity` cells; removal swaps
+    the last cell into the hole. Both are flat machine-int arrays, a few
+    bytes per grid cell.
+    """
+
+    __slots__ = ('_cells', '_slots')
+
+    def __init__(self, cells=(), capacity=GRID_SIZE * GRID_SIZE):
+        self._cells = array('I', cells.tolist() if isinstance(cells, np.ndarray) else cells)
+        self._slots = array('i', [-1]) * capacity
+        for i, cell in enumerate(self._cells):
+            self._slots[cell] = i
+
+    def add(self, cell):
+        if self._slots[cell] < 0:
+            self._slots[cell] = len(self._cells)
+            self._cells.append(cell)
+
+    def discard(self, cell):
+        i = self._slots[cell]
+        if i < 0:
+            return
+        self._slots[cell] = -1
+        last = self._cells.pop()
+        if i < len(self._cells):
+            self._cells[i] = last
+            self._slots[last] = i
+
+    def sample(self, rng):
+        """A uniformly random cell, or None when empty"""
+        if not self._cells:
+            return None
+        return self._cells[rng.randrange(len(self._cells))]
+
+    def pop_random(self, rng):
+        """Remove and return a uniformly random cell, or None when empty"""
+        cell = self.sample(rng)
+        if cell is not None:
+            self.discard(cell)
+        return cell
+
+    def __contains__(self, cell):
+        return self._slots[cell] >= 0
+
+    def __len__(self):
+        return len(self._cells)
+
+    def __iter__(self):
+        return iter(self._cells)
+
+
+class PackedCells:
+    """Read-only sequence of (x, y) cells stored as packed `y*G+x` integers"""
+
+    __slots__ = ('cells', 'size')
+
+    def __init__(self, cells, size):
+        self.cells = array('I', cells)
+        self.size = size
+
+    def __getitem__(self, i):
+        cell = self.cells[i]
+        return (cell % self.size, cell // self.size)
+
+    def __iter__(self):
+        size = self.size
+        return iter([(cell % size, cell // size) for cell in self.cells])
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __repr__(self):
+        return f"PackedCells({list(self)!r})"
+
+
+def free_in_box(grid, x0, y0, x1, y1):
+    """Packed empty cells of `grid` with x0 <= x <= x1 and y0 <= y <= y1"""
+    size = grid.shape[1]
+    ys, xs = np.nonzero(grid[y0:y1+1, x0:x1+1] == EMPTY)
+    return ((ys + y0) * size + xs + x0).tolist()
+
+
+class SnakeBody:
+    """Snake body cells, head first.
+
+    The cells are packed `y*G+x` integers in an `array('I')` ring buffer,
+    4 bytes per cell, that doubles when full, plus a set of the same
+    integers for O(1) membership tests. Pushing the head, popping the
+    tail and reading either end are O(1); cells come back as (x, y)
+    tuples, and iterating yields them one at a time without copying the
+    body.
+    """
+
+    __slots__ = ('size', 'head', '_cells', '_start', '_length', '_members')
+
+    def __init__(self, cells=(), size=GRID_SIZE):
+        self.size = size
+        cells = [tuple(cell) for cell in cells]
+        # The head is read several times a tick, so its tuple is kept
+        self.head = cells[0] if cells else None
+        self._cells = array('I', [y * size + x for x, y in cells] or [0])
+        self._start = 0
+        self._length = len(cells)
+        self._members = set(self._cells[:self._length])
+
+    @property
+    def tail(self):
+        cells = self._cells
+        cell = cells[(self._start + self._length - 1) % len(cells)]
+        return (cell % self.size, cell // self.size)
+
+    def push_head(self, pos):
+        if self._length == len(self._cells):
+            self._grow()
+        cell = pos[1] * self.size + pos[0]
+        self._start = (self._start - 1) % len(self._cells)
+        self._cells[self._start] = cell
+        self._members.add(cell)
+        self._length += 1
+        self.head = pos
+
+    def pop_tail(self):
+        cells = self._cells
+        self._length -= 1
+        cell = cells[(self._start + self._length) % len(cells)]
+        self._members.discard(cell)
+        return (cell % self.size, cell // self.size)
+
+    def _grow(self):
+        packed = self.packed()
+        self._cells = array('I', packed) * 2
+        self._start = 0
+
+    def packed(self):
+        """The packed cells, head first"""
+        cells, start = self._cells, self._start
+        end = start + self._length
+        if end <= len(cells):
+            return cells[start:end]
+        return cells[start:] + cells[:end - len(cells)]
+
+    def _unpacked(self, first):
+        cells, size = self._cells, self.size
+        for i in range(self._start + first, self._start + self._length):
+            cell = cells[i % len(cells)]
+            yield (cell % size, cell // size)
+
+    def body(self):
+        """The cells behind the head, yielded one at a time"""
+        return self._unpacked(1)
+
+    def __contains__(self, pos):
+        return pos[1] * self.size + pos[0] in self._members
+
+    def __iter__(self):
+        return self._unpacked(0)
+
+    def __len__(self):
+        return self._length
+
+    def __bool__(self):
+        return self._length > 0
+
+    def __repr__(self):
+        return f"SnakeBody({list(self)!r})"
+
+
+def generate_landscape(rng, grid, obstacle_count):
+    """Generate village landscape elements into `grid`.
+
+    Each kind of landscape is sampled without replacement from the free
+    cells of its region (the band inside the boundary for mountains,
+    a box around each cluster centre for trees, houses and water), so
+    every placement takes bounded time and never lands on an occupied
+    cell. A region that fills up simply gets fewer objects. Each kind's
+    cells are returned as PackedCells.
+    """
+    size = grid.shape[0]
+    landscape = {
+        'mountains': [],
+        'trees': [],
+        'houses': [],
+        'water': []
+    }
+
+    def place(kind, region, count):
+        code = LANDSCAPE_CODES[kind]
+        for cell in rng.sample(region, min(count, len(region))):
+            y, x = divmod(cell, size)
+            grid[y, x] = code
+            landscape[kind].append(cell)
+
+    def cluster(center_x, center_y, spread):
+        return free_in_box(grid,
+                           max(1, center_x - spread), max(1, center_y - spread),
+                           min(size-2, center_x + spread), min(size-2, center_y + spread))
+
+    # Add mountains (usually at edges)
+    band = mountain_band(size)
+    band = band[grid.reshape(-1)[band] == EMPTY].tolist()
+    place('mountains', band, obstacle_count['mountain'])
+
+    # Add trees (forest clusters)
+    forest_center_x = rng.randint(5, size-5)
+    forest_center_y = rng.randint(5, size-5)
+    place('trees', cluster(forest_center_x, forest_center_y, 5), obstacle_count['tree'])
+
+    # Add houses (village area)
+    village_center_x = rng.randint(10, size-10)
+    village_center_y = rng.randint(10, size-10)
+
+    # Ensure village is not in the forest (a forest in the middle of a
+    # small map can make this impossible, so give up after 100 attempts)
+    for attempt in range(100):
+        if not (abs(village_center_x - forest_center_x) < 8 and abs(village_center_y - forest_center_y) < 8):
+            break
+        village_center_x = rng.randint(10, size-10)
+        village_center_y = rng.randint(10, size-10)
+
+    place('houses', cluster(village_center_x, village_center_y, 4), obstacle_count['house'])
+
+    # Add water bodies
+    water_center_x = rng.randint(5, size-5)
+    water_center_y = rng.randint(5, size-5)
+
+    # Ensure water is not in village or directly in forest
+    for attempt in range(100):
+        if not ((abs(water_center_x - village_center_x) < 7 and abs(water_center_y - village_center_y) < 7) or
+                (abs(water_center_x - forest_center_x) < 5 and abs(water_center_y - forest_center_y) < 5)):
+            break
+        water_center_x = rng.randint(5, size-5)
+        water_center_y = rng.randint(5, size-5)
+
+    place('water', cluster(water_center_x, water_center_y, 3), obstacle_count['water'])
+
+    return {kind: PackedCells(cells, size) for kind, cells in landscape.items()}
+
+
+def initial_snake(grid_size=GRID_SIZE):
+    """Starting snake cells, head first"""
+    head_x, head_y = grid_size//2, grid_size//2
+    return [(head_x - i, head_y) for i in range(INITIAL_SNAKE_LENGTH)]
+
+
+# Grids up to this size are flooded whole when looking for pockets; larger
+# ones are checked from their landscape cells (see pocket_cells)
+_FLOOD_MAX_SIZE = 64
+
+
+def _unreached(free, seeds):
+    """(ys, xs) of the True cells of `free` that are not 4-connected to a `seeds` cell.
+
+    Floods a bitboard: one Python int with a spare bit after every row
+    to keep rows apart.
+    """
+    rows, cols = free.shape
+    width = cols + 1
+    bits = np.zeros((rows, width), dtype=bool)
+    bits[:, :cols] = free
+    board = int.from_bytes(np.packbits(bits, bitorder='little').tobytes(), 'little')
+    bits[:, :cols] = seeds & free
+    reach = int.from_bytes(np.packbits(bits, bitorder='little').tobytes(), 'little')
+
+    while True:
+        grown = (reach | reach << 1 | reach >> 1 | reach << width | reach >> width) & board
+        if grown == reach:
+            break
+        reach = grown
+
+    left = board & ~reach
+    if not left:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+    nbytes = (rows * width + 7) // 8
+    bits = np.unpackbits(np.frombuffer(left.to_bytes(nbytes, 'little'), dtype=np.uint8),
+                         bitorder='little')
+    return np.divmod(np.flatnonzero(bits), width)
+
+
+# The eight neighbours of a cell, in the bit order of neighbour masks
+_AROUND = ((-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+
+
+@lru_cache(maxsize=None)
+def _euler_deltas():
+    """How the Euler number (8-connected components minus holes) of a set of
+    cells changes when a cell is added, for each mask of its neighbours.
+
+    Built on first use rather than at import, as it takes a few
+    milliseconds and only large maps need it.
+    """
+
+    def quads(cells):
+        # 4 x Euler number over the four 2x2 windows holding the centre
+        total = 0
+        for qx in (-1, 0):
+            for qy in (-1, 0):
+                a, b, c, d = ((qx + dx, qy + dy) in cells for dx, dy in ((0, 0), (1, 0), (0, 1), (1, 1)))
+                n = a + b + c + d
+                total += 1 if n == 1 else -1 if n == 3 else -2 if n == 2 and a == d else 0
+        return total
+
+    deltas = []
+    for mask in range(256):
+        cells = {cell for i, cell in enumerate(_AROUND) if mask >> i & 1}
+        deltas.append((quads(cells | {(0, 0)}) - quads(cells)) // 4)
+    deltas = np.array(deltas, dtype=np.int64)
+    deltas.flags.writeable = False
+    return deltas
+
+
+@lru_cache(maxsize=None)
+def _boundary_masks(grid_size):
+    """Neighbour masks (as in _euler_deltas) of the boundary around each packed cell"""
+    last = grid_size - 1
+    masks = np.zeros(grid_size * grid_size, dtype=np.uint8)
+    for y in range(1, last):
+        for x in (range(1, last) if y in (1, last - 1) else (1, last - 1)):
+            masks[y * grid_size + x] = sum(1 << i for i, (dx, dy) in enumerate(_AROUND)
+                                           if x + dx in (0, last) or y + dy in (0, last))
+    masks.flags.writeable = False
+    return masks
+
+
+def pocket_cells(grid, start, landscape_cells=None):
+    """Packed empty interior cells that cannot be reached from the `start` cells.
+
+    The villager only ever spawns in the interior, and border gaps never
+    join two interior regions, so the whole boundary counts as wall. The
+    start cells count as free whatever `grid` holds there.
+
+    Without `landscape_cells` (the packed cells of every landscape
+    object), or on grids up to 64 cells wide, the interior is flooded
+    from the start: a few dozen microseconds at 30x30, but growing with
+    the cube of the size. With them, larger grids are checked in time
+    that depends on the landscape only (see _landscape_pockets).
+    """
+    size = grid.shape[0]
+    if landscape_cells is not None and size > _FLOOD_MAX_SIZE:
+        return _landscape_pockets(grid, start, landscape_cells)
+    free = np.zeros((size, size), dtype=bool)
+    free[1:size-1, 1:size-1] = grid[1:size-1, 1:size-1] == EMPTY
+    seeds = np.zeros((size, size), dtype=bool)
+    for x, y in start:
+        free[y, x] = seeds[y, x] = True
+    ys, xs = _unreached(free, seeds)
+    return (ys * size + xs).tolist()
+
+
+def _landscape_pockets(grid, start, landscape_cells):
+    """pocket_cells from the landscape: cost grows with its cells, not the grid.
+
+    Interior regions are the holes of the wall made of landscape plus
+    boundary, so there are `components - Euler number` of them, and one
+    region means no pockets. The Euler number is summed from each
+    landscape cell's neighbourhood, and components are joined from runs
+    of cells along a row. Otherwise every pocket lies inside the
+    bounding box of a component with holes of its own; those boxes are
+    flooded from their edges. A component that reaches across between
+    opposite sides, or a start cell found walled in, falls back to
+    flooding the whole grid.
+    """
+    size = grid.shape[0]
+    cells = np.sort(np.fromiter(landscape_cells, dtype=np.int64))
+    count = len(cells)
+    if not count:
+        return []
+
+    # Masks of the boundary and of the landscape cells before each cell
+    mask = _boundary_masks(size)[cells]
+    links = []
+    for bit, offset in ((1, size + 1), (2, size), (4, size - 1), (8, 1)):
+        index = np.searchsorted(cells, cells - offset)
+        found = cells[np.minimum(index, count - 1)] == cells - offset
+        mask[found] |= bit
+        links.append((found, index))
+    changes = _euler_deltas()[mask]
+    euler = int(changes.sum())
+
+    # Runs of cells side by side, joined to the runs they touch in the row above
+    new_run = ~links[3][0]
+    run = np.cumsum(new_run) - 1
+    firsts = np.flatnonzero(new_run)
+    runs = len(firsts)
+    pairs = np.unique(np.concatenate([run[found] * runs + run[index[found]]
+                                      for found, index in links[:3]]))
+    lower, upper = divmod(pairs, runs)
+    parent = list(range(runs))
+    components = runs
+    for a, b in zip(lower.tolist(), upper.tolist()):
+        while parent[a] != a:
+            parent[a] = a = parent[parent[a]]
+        while parent[b] != b:
+            parent[b] = b = parent[parent[b]]
+        if a != b:
+            parent[max(a, b)] = min(a, b)
+            components -= 1
+    # Parents always come first, so one pass points every run at its root
+    for a in range(runs):
+        parent[a] = parent[parent[a]]
+
+    ys, x0 = np.divmod(cells[firsts], size)
+    x1 = x0 + np.diff(np.append(firsts, count)) - 1
+    edge = (ys == 1) | (ys == size - 2) | (x0 == 1) | (x1 == size - 2)
+    roots = np.array(parent)
+    if components - len(set(roots[edge].tolist())) - euler == 0:
+        return []
+
+    # Find the components that wall something in, with their boxes
+    labels, index = np.unique(roots, return_inverse=True)
+    touching = np.zeros(len(labels), dtype=bool)
+    touching[index[edge]] = True
+    holes = (~touching).astype(np.int64) - np.bincount(
+        index, np.add.reduceat(changes, firsts), len(labels)).astype(np.int64)
+    bx0 = np.full(len(labels), size)
+    by0 = np.full(len(labels), size)
+    bx1 = np.zeros(len(labels), dtype=np.int64)
+    by1 = np.zeros(len(labels), dtype=np.int64)
+    np.minimum.at(bx0, index, x0)
+    np.minimum.at(by0, index, ys)
+    np.maximum.at(bx1, index, x1)
+    np.maximum.at(by1, index, ys)
+
+    starts = {y * size + x for x, y in start}
+    pockets = set()
+    for i in np.flatnonzero(holes > 0).tolist():
+        if bx0[i] == 1 and bx1[i] == size - 2 or by0[i] == 1 and by1[i] == size - 2:
+            return pocket_cells(grid, start)
+        wx0, wy0 = max(bx0[i] - 1, 0), max(by0[i] - 1, 0)
+        wx1, wy1 = min(bx1[i] + 1, size - 1), min(by1[i] + 1, size - 1)
+        window = grid[wy0:wy1+1, wx0:wx1+1]
+        free = window == EMPTY
+        for x, y in start:
+            if wx0 <= x <= wx1 and wy0 <= y <= wy1:
+                free[y - wy0, x - wx0] = True
+        # The boundary is wall; the rest of the window's edge is open ground
+        if wx0 == 0:
+            free[:, 0] = False
+        if wx1 == size - 1:
+            free[:, -1] = False
+        if wy0 == 0:
+            free[0] = False
+        if wy1 == size - 1:
+            free[-1] = False
+        seeds = np.zeros_like(free)
+        seeds[:, [0, -1]] = seeds[[0, -1], :] = True
+        wys, wxs = _unreached(free, seeds)
+        found = ((wys + wy0) * size + wxs + wx0).tolist()
+        if not starts.isdisjoint(found):
+            return pocket_cells(grid, start)
+        pockets.update(found)
+    return sorted(pockets)
+
+
+def repair_landscape(grid, landscape, start):
+    """Make every empty interior cell of `grid` reachable from the `start` cells.
+
+    Landscape on a start cell is removed, and every pocket of empty cells
+    the landscape walls off (see pocket_cells) is filled with the
+    landscape around it, so the rest of the map stays as it was. Should
+    the snake itself be the one walled in, the landscape around the start
+    is cleared instead, a wider box each time, until it is not. Draws no
+    random numbers. Returns the updated landscape.
+    """
+    size = grid.shape[0]
+    flat = grid.reshape(-1)
+    blocked = [y * size + x for x, y in start if grid[y, x] >= MOUNTAIN]
+    pockets = None
+    if not blocked:
+        pockets = pocket_cells(grid, start, [cell for pc in landscape.values() for cell in pc.cells])
+        if not pockets:
+            return landscape
+
+    kinds = {code: kind for kind, code in LANDSCAPE_CODES.items()}
+    owner = {cell: kind for kind, pc in landscape.items() for cell in pc.cells}
+    for cell in blocked:
+        flat[cell] = EMPTY
+        del owner[cell]
+    xs, ys = zip(*start)
+    radius = 0
+    while True:
+        if pockets is None:
+            pockets = pocket_cells(grid, start, owner)
+        if not pockets or 2 * len(pockets) < (grid[1:size-1, 1:size-1] == EMPTY).sum():
+            break
+        # The snake is walled in: clear the landscape around it
+        radius += 2
+        x0, y0 = max(min(xs) - radius, 1), max(min(ys) - radius, 1)
+        x1, y1 = min(max(xs) + radius, size - 2), min(max(ys) + radius, size - 2)
+        box = grid[y0:y1+1, x0:x1+1]
+        for y, x in zip(*np.nonzero(box >= MOUNTAIN)):
+            del owner[(y + y0) * size + x + x0]
+        box[box >= MOUNTAIN] = EMPTY
+        pockets = None
+
+    # Fill pockets from their walls inwards; cells walled in by the boundary
+    # alone become mountains
+    added = []
+    while pockets:
+        left = []
+        for cell in pockets:
+            code = max(flat[cell - size], flat[cell - 1], flat[cell + 1], flat[cell + size])
+            if code >= MOUNTAIN:
+                flat[cell] = code
+                owner[cell] = kinds[code]
+                added.append(cell)
+            else:
+                left.append(cell)
+        if len(left) == len(pockets):
+            flat[left] = MOUNTAIN
+            owner.update(dict.fromkeys(left, 'mountains'))
+            added.extend(left)
+            break
+        pockets = left
+
+    # Keep the generated order, with new cells after it
+    return {kind: PackedCells([cell for cell in pc.cells if owner.get(cell) == kind] +
+                              sorted(cell for cell in added if owner[cell] == kind), size)
+            for kind, pc in landscape.items()}
+
+
+class GameMap:
+    """A generated landscape, shared read-only by every game played on it.
+
+    `grid` holds the boundary and landscape codes (never the snake or the
+    human) and `rng_state` is the seeded random stream right after
+    generation, so a game started from a stored map plays exactly like one
+    that generated the map itself. The stream's 625 state words are kept
+    in an `array('I')` rather than a tuple of ints, about 2.5 KB instead
+    of 25 KB per map.
+    """
+
+    __slots__ = ('seed', 'grid_size', 'obstacle_count', 'grid', 'landscape', 'rng_words',
+                 'rng_gauss', 'map_id')
+
+    def __init__(self, seed, grid_size, obstacle_count, grid, landscape, rng_state):
+        self.seed = seed
+        self.grid_size = grid_size
+        self.obstacle_count = obstacle_count
+        self.grid = grid
+        self.landscape = landscape
+        _, words, self.rng_gauss = rng_state
+        self.rng_words = array('I', words)
+        self.map_id = next(_map_ids)
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__ if name != 'map_id'}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+        # Ids are only unique within a process, so a map pickled elsewhere
+        # (e.g. by a ProcessPoolExecutor worker) gets a new one here
+        self.map_id = next(_map_ids)
+
+    @property
+    def rng_state(self):
+        return (3, tuple(self.rng_words), self.rng_gauss)
+
+
+def new_seed():
+    """A fresh random game seed (63 bits, so it packs into a signed int64)"""
+    return random.SystemRandom().getrandbits(63)
+
+
+def generate_map(seed=None, grid_size=GRID_SIZE, obstacle_count=None):
+    """Generate the boundary and landscape for a new game.
+
+    Every map has a concrete seed, drawn at random when none is given, so
+    any game can be reproduced from its seed and inputs. Landscape that
+    blocks the snake's first move or walls off part of the interior is
+    repaired locally (repair_landscape), so the villager can always be
+    reached.
+    """
+    if seed is None:
+        seed = new_seed()
+    obstacle_count = dict(obstacle_count or OBSTACLE_COUNT)
+    rng = random.Random(seed)
+    grid = boundary_grid(grid_size).copy()
+
+    # Keep the landscape off the starting snake
+    start = initial_snake(grid_size)
+    for x, y in start:
+        grid[y, x] = SNAKE_BODY
+    landscape = generate_landscape(rng, grid, obstacle_count)
+
+    # ...and its first move, and make sure nothing is walled off
+    head_x, head_y = start[0]
+    start.insert(0, (head_x + 1, head_y))
+    landscape = repair_landscape(grid, landscape, start)
+    for x, y in start:
+        grid[y, x] = EMPTY
+
+    grid.flags.writeable = False
+    return GameMap(seed, grid_size, obstacle_count, grid, landscape, rng.getstate())
+
+
+class SnakeGame:
+    """Headless Snake in Dholakpur game engine.
+
+    Holds the full state of one game and advances it one tick per `step`
+    call. It has no Streamlit dependency, so it can be driven from tests,
+    benchmarks or simulations as fast as Python allows.
+
+    `grid` is a `grid_size x grid_size` uint8 occupancy array indexed as
+    `grid[y, x]` with one cell code per cell. It is updated incrementally as
+    the snake and human move, and every collision and placement check reads
+    it instead of scanning coordinate lists. `free_cells()` indexes the
+    empty interior cells, so villagers can always be placed in O(1).
+
+    The landscape comes from a GameMap, generated from the seed on reset or
+    handed in ready-made (e.g. from snake_maps.MapPool). `landscape` is that
+    map's shared dict and must not be modified.
+
+    With `record_changes=True` every grid write made while playing is also
+    appended to `changes` as `(x, y, code)`, so views can send patches
+    instead of whole frames. A reset starts a new game (new `game_id`) and
+    clears the log; consumers should resync from `grid` when that happens.
+
+    `human_policy` picks the villager's escape moves. By default it steps
+    greedily away from the head in a straight line; any object with a
+    `choose(game, pos)` method returning the next cell (or None to stay)
+    can replace that, e.g. snake_ai.FieldEscape.
+
+    When the snake crashes, `cause` records what it ran into: 'wall',
+    'self' or the landscape kind (see COLLISION_CAUSES).
+    """
+
+    __slots__ = (
+        'grid_size', 'obstacle_count', 'human_policy', 'changes', 'map', 'seed', 'map_id',
+        'game_id', 'rng', 'snake', 'direction', 'human', 'score', 'obstacles', 'landscape',
+        'game_over', 'cause', 'win', 'paused', 'ticks', 'grid', 'free'
+    )
+
+    def __init__(self, grid_size=GRID_SIZE, obstacle_count=None, seed=None,
+                 record_changes=False, human_policy=None, game_map=None):
+        self.grid_size = grid_size
+        self.obstacle_count = dict(obstacle_count or OBSTACLE_COUNT)
+        self.human_policy = human_policy
+        self.changes = [] if record_changes else None
+        self.reset(seed, game_map)
+
+    def reset(self, seed=None, game_map=None):
+        """Start a new game with a fresh landscape and villager.
+
+        Plays on `game_map` when given, otherwise generates the map for
+        `seed` (a random one when None).
+        """
+        if game_map is None:
+            game_map = generate_map(seed, self.grid_size, self.obstacle_count)
+        self.map = game_map
+        self.seed = game_map.seed
+        self.grid_size = game_map.grid_size
+        self.obstacle_count = game_map.obstacle_count
+        self.map_id = game_map.map_id
+        self.game_id = next(_game_ids)
+        self.rng = random.Random()
+        self.rng.setstate(game_map.rng_state)
+        if self.changes is not None:
+            self.changes.clear()
+
+        # Create initial snake
+        self.snake = SnakeBody(initial_snake(self.grid_size), self.grid_size)
+
+        self.direction = RIGHT
+        self.human = None
+        self.score = 0
+        self.obstacles = boundary_obstacles(self.grid_size)
+        self.landscape = game_map.landscape
+        self.game_over = False
+        self.cause = None
+        self.win = False
+        self.paused = False
+        self.ticks = 0
+
+        self.grid = game_map.grid.copy()
+        head_x, head_y = self.snake.head
+        self.grid[head_y, head_x] = SNAKE_HEAD
+        for x, y in self.snake.body():
+            self.grid[y, x] = SNAKE_BODY
+
+        # Built on first use by free_cells(), then kept up to date by set_cell
+        self.free = None
+
+        # Generate human position
+        self.place_human(self.generate_human())
+        return self
+
+    @property
+    def done(self):
+        return self.game_over or self.win
+
+    def set_cell(self, x, y, code):
+        """Write one grid cell, logging it when changes are recorded"""
+        self.grid[y, x] = code
+        if self.free is not None and 0 < x < self.grid_size-1 and 0 < y < self.grid_size-1:
+            if code == EMPTY:
+                self.free.add(y * self.grid_size + x)
+            else:
+                self.free.discard(y * self.grid_size + x)
+        if self.changes is not None:
+            self.changes.append((x, y, code))
+
+    def free_cells(self):
+        """Index of the empty interior cells, built on first use"""
+        if self.free is None:
+            size = self.grid_size
+            self.free = FreeCells(free_in_box(self.grid, 1, 1, size-2, size-2), size * size)
+        return self.free
+
+    def drain_changes(self):
+        """Return and clear the cells changed since the last drain"""
+        changes = self.changes or []
+        if self.changes is not None:
+            self.changes = []
+        return changes
+
+    def place_human(self, pos):
+        """Move the human marker on the grid to `pos` (or remove it)"""
+        if self.human and self.grid[self.human[1], self.human[0]] == HUMAN:
+            self.set_cell(self.human[0], self.human[1], EMPTY)
+        self.human = pos
+        if pos and self.grid[pos[1], pos[0]] == EMPTY:
+            self.set_cell(pos[0], pos[1], HUMAN)
+
+    def generate_human(self):
+        """Generate a new position for the human.
+
+        Prefers a free cell within 3 steps of a random house and otherwise
+        takes any free interior cell. Returns None only when the board has
+        no free cell left.
+        """
+        rng = self.rng
+        size = self.grid_size
+
+        # Prefer placing human near houses
+        if len(self.landscape['houses']) > 0:
+            x, y = rng.choice(self.landscape['houses'])
+            nearby = free_in_box(self.grid, max(1, x-3), max(1, y-3), min(size-2, x+3), min(size-2, y+3))
+            if nearby:
+                cell = rng.choice(nearby)
+                return (cell % size, cell // size)
+
+        # Fallback to random placement
+        cell = self.free_cells().sample(rng)
+        if cell is None:
+            return None
+        return (cell % size, cell // size)
+
+    def move_human(self):
+        """Move the human character to escape from snake"""
+        if not self.human:
+            return
+
+        # Human only moves every few snake moves (slower than snake)
+        if self.rng.random() > 0.3:
+            return
+
+        if self.human_policy is not None:
+            new_pos = self.human_policy.choose(self, self.human)
+            if new_pos:
+                self.place_human(new_pos)
+            return
+
+        size = self.grid_size
+        grid = self.grid
+        human_pos = self.human
+        snake_head = self.snake.head
+
+        # Get distance to snake
+        dx = snake_head[0] - human_pos[0]
+        dy = snake_head[1] - human_pos[1]
+
+        # Try to move away from snake
+        possible_moves = []
+        for direction in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
+            new_pos = (human_pos[0] + direction[0], human_pos[1] + direction[1])
+
+            # Check if move is valid
+            if (0 < new_pos[0] < size-1 and 0 < new_pos[1] < size-1 and
+                grid[new_pos[1], new_pos[0]] == EMPTY):
+
+                # Calculate if this move increases distance from snake
+                new_dx = snake_head[0] - new_pos[0]
+                new_dy = snake_head[1] - new_pos[1]
+                old_dist = dx*dx + dy*dy
+                new_dist = new_dx*new_dx + new_dy*new_dy
+
+                if new_dist >= old_dist:
+                    possible_moves.append((new_pos, new_dist))
+
+        if possible_moves:
+            # Sort by distance (prefer moves that maximize distance)
+            possible_moves.sort(key=lambda x: x[1], reverse=True)
+            self.place_human(possible_moves[0][0])
+        # If trapped, stay in place
+
+    def move_snake(self):
+        """Advance the snake one cell and resolve collisions and catches"""
+        if self.paused or self.game_over or self.win:
+            return
+
+        size = self.grid_size
+        grid = self.grid
+        head = self.snake.head
+        direction = self.direction
+
+        # Calculate new head position
+        new_x, new_y = new_head = (head[0] + direction[0], head[1] + direction[1])
+
+        # Check for collisions with obstacles or self (the tail still
+        # occupies its cell at this point, as before)
+        if (new_x < 0 or new_x >= size or
+            new_y < 0 or new_y >= size):
+            self.game_over = True
+            self.cause = 'wall'
+            return
+        if grid[new_y, new_x] >= SNAKE_HEAD:
+            self.game_over = True
+            self.cause = COLLISION_CAUSES[grid[new_y, new_x]]
+            return
+
+        # Move snake
+        self.snake.push_head(new_head)
+        self.set_cell(head[0], head[1], SNAKE_BODY)
+        self.set_cell(new_x, new_y, SNAKE_HEAD)
+        self.ticks += 1
+
+        # Check if human is caught
+        if new_head == self.human:
+            self.score += CATCH_REWARD
+
+            # Check win condition
+            if self.score >= WIN_SCORE:
+                self.win = True
+                return
+
+            self.place_human(self.generate_human())
+            # Don't remove tail - snake grows
+        else:
+            tail = self.snake.pop_tail()
+            self.set_cell(tail[0], tail[1], EMPTY)
+
+        # Move human to escape
+        self.move_human()
+
+    def change_direction(self, new_direction):
+        """Turn the snake, ignoring 180-degree reversals"""
+        current_direction = self.direction
+        if (new_direction[0] != -current_direction[0] or new_direction[1] != -current_direction[1]):
+            self.direction = new_direction
+
+    def toggle_pause(self):
+        self.paused = not self.paused
+
+    def step(self, action=None):
+        """Apply an optional direction and advance one tick; returns `done`"""
+        if action is not None:
+            self.change_direction(action)
+        self.move_snake()
+        return self.done
+
+    def get_state(self):
+        """Everything that changes during play, as plain Python values.
+
+        Together with the map (`seed`, `grid_size`, `obstacle_count`) this is
+        enough to continue the game exactly, random stream included.
+        """
+        return {
+            'snake': list(self.snake),
+            'direction': self.direction,
+            'human': self.human,
+            'score': self.score,
+            'game_over': self.game_over,
+            'cause': self.cause,
+            'win': self.win,
+            'paused': self.paused,
+            'ticks': self.ticks,
+            'rng_state': self.rng.getstate(),
+            # The index's order decides which cell a sample picks
+            'free': list(self.free._cells) if self.free is not None else None
+        }
+
+    def set_state(self, state):
+        """Restore a `get_state` result onto a game reset on the same map"""
+        self.snake = SnakeBody(state['snake'], self.grid_size)
+        self.direction = tuple(state['direction'])
+        self.score = state['score']
+        self.game_over = state['game_over']
+        self.cause = state.get('cause')
+        self.win = state['win']
+        self.paused = state['paused']
+        self.ticks = state['ticks']
+        self.rng.setstate(state['rng_state'])
+
+        self.grid = self.map.grid.copy()
+        head_x, head_y = self.snake.head
+        self.grid[head_y, head_x] = SNAKE_HEAD
+        for x, y in self.snake.body():
+            self.grid[y, x] = SNAKE_BODY
+        self.human = None
+        self.free = None
+        human = state['human']
+        self.place_human(tuple(human) if human else None)
+        if state['free'] is not None:
+            self.free = FreeCells(state['free'], self.grid_size ** 2)
+        if self.changes is not None:
+            self.changes.clear()
+        return self
@@ -0,0 +1,42 @@
+# Maps raw cell codes 0..9 to ASCII digits
+_DIGITS = bytes.maketrans(bytes(range(10)), b"0123456789")
+_CODES = bytes.maketrans(b"0123456789", bytes(range(10)))
+
+
+def full_frame(game, seq):
+    """Every cell code of `game`, one character per cell, row by row"""
+    return {
+        'kind': 'full',
+        'seq': seq,
+        'size': game.grid_size,
+        'cells': game.grid.tobytes().translate(_DIGITS).decode('ascii')
+    }
+
+
+def patch_frame(changes, grid_size, base_seq):
+    """The cells changed since `base_seq` as a flat index/code list"""
+    cells = []
+    for x, y, code in changes:
+        cells.append(y * grid_size + x)
+        cells.append(int(code))
+    return {'kind': 'patch', 'seq': base_seq + 1, 'base': base_seq, 'cells': cells}
+
+
+def apply_frame(board, frame):
+    """Apply a frame to a client-side `board` dict; False when a full frame is needed.
+
+    `board` holds 'seq', 'size' and 'cells' (a bytearray of cell codes), the
+    same copy the canvas frontend keeps in the browser.
+    """
+    if frame['kind'] == 'full':
+        board['size'] = frame['size']
+        board['cells'] = bytearray(frame['cells'].encode('ascii').translate(_CODES))
+    elif board.get('cells') is not None and frame['base'] == board.get('seq'):
+        cells = board['cells']
+        patch = frame['cells']
+        for i in range(0, len(patch), 2):
+            cells[patch[i]] = patch[i + 1]
+    else:
+        return frame['seq'] == board.get('seq')
+    board['seq'] = frame['seq']
+    return True
@@ -0,0 +1,138 @@
+"""Memory footprint of Snake sessions, for sizing servers.
+
+Builds a number of sessions like the Streamlit page does (a game with the
+distance-field villager, a replay recorder, a scheduler and an autopilot),
+plays them for a while and reports the bytes each session costs, both as
+measured by tracemalloc and broken down per component:
+
+    python snake_memory.py --sessions 500 --ticks 300
+"""
+import argparse
+import json
+import sys
+import tracemalloc
+import types
+from array import array
+from collections import deque
+
+import numpy as np
+
+from snake_engine import SnakeGame, MOVE_INTERVAL
+from snake_ai import FieldEscape
+from snake_bots import Autopilot
+from snake_replay import ReplayRecorder
+from snake_scheduler import TickScheduler
+
+
+# Shared by everything in the process, never part of a session
+_NOT_COUNTED = (type, types.FunctionType, types.MethodType, types.BuiltinFunctionType, types.ModuleType)
+
+
+def deep_size(obj, exclude=()):
+    """Bytes held by `obj` and everything it references.
+
+    Follows containers, instance dicts and slots, and counts the buffers
+    of NumPy arrays and `array.array`s. Objects whose ids are in `exclude`
+    (e.g. shared maps) and everything only reachable through them are
+    left out; classes, functions and modules are never counted.
+    """
+    return _walk(obj, set(exclude))
+
+
+def _walk(obj, seen):
+    """deep_size of `obj` skipping the ids in `seen`, which gains every id visited"""
+    total = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen or isinstance(o, _NOT_COUNTED):
+            continue
+        seen.add(id(o))
+        total += sys.getsizeof(o)
+        if isinstance(o, np.ndarray):
+            if o.base is not None:
+                stack.append(o.base)
+            continue
+        if isinstance(o, (str, bytes, bytearray, int, float, array)):
+            continue
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset, deque)):
+            stack.extend(o)
+        if hasattr(o, '__dict__'):
+            stack.append(o.__dict__)
+        for cls in type(o).__mro__:
+            for name in getattr(cls, '__slots__', ()):
+                if name != '__dict__' and hasattr(o, name):
+                    stack.append(getattr(o, name))
+    return total
+
+
+def session_report(session):
+    """Bytes per component of one session dict (name -> object).
+
+    The game's map can be shared by every game played on its seed (see
+    snake_maps.MapPool) and the boundary is shared by all games of a grid
+    size, so both are reported as `shared` and left out of the other
+    components; `total` is what the session itself adds.
+    """
+    game = session.get('game')
+    shared = set()
+    report = {}
+    if game is not None:
+        report['shared'] = _walk((game.map, game.obstacles), shared)
+    for name, obj in session.items():
+        others = {id(other) for key, other in session.items() if key != name}
+        report[name] = deep_size(obj, shared | others)
+    report['total'] = deep_size(session, shared)
+    return report
+
+
+def new_session():
+    """The objects the Streamlit page keeps per session"""
+    game = SnakeGame(record_changes=True, human_policy=FieldEscape())
+    return {
+        'game': game,
+        'recorder': ReplayRecorder(game),
+        'scheduler': TickScheduler(MOVE_INTERVAL),
+        'pilot': Autopilot(),
+        'canvas_sync': {}
+    }
+
+
+def play(session, ticks):
+    game, recorder, pilot = session['game'], session['recorder'], session['pilot']
+    for _ in range(ticks):
+        if game.done:
+            break
+        game.change_direction(pilot.choose(game) or game.direction)
+        recorder.record()
+        game.step()
+        game.drain_changes()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--ticks", type=int, default=300, help="ticks each session plays before measuring")
+    args = parser.parse_args(argv)
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [new_session() for _ in range(args.sessions)]
+    for session in sessions:
+        play(session, args.ticks)
+    measured = (tracemalloc.get_traced_memory()[0] - before) / args.sessions
+    tracemalloc.stop()
+
+    report = session_report(sessions[0])
+    report['shared'] = report.pop('shared')
+    print(json.dumps({'sessions': args.sessions, 'ticks': args.ticks,
+                      'bytes_per_session': round(measured),
+                      'first_session': report}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
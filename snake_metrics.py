@@ -0,0 +1,353 @@
+import json
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, deque
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Latency histogram bucket bounds in seconds (Prometheus `le` labels)
+LATENCY_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025,
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0
+)
+
+# Payload size bucket bounds in bytes
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    """Counts of observations per bucket, plus their total count and sum"""
+
+    __slots__ = ('bounds', 'counts', 'count', 'sum')
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # the last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding quantile `q` (None when empty)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.bounds, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'p50': self.quantile(0.5),
+            'p99': self.quantile(0.99),
+            'buckets': dict(zip([*map(str, self.bounds), '+Inf'], self.counts))
+        }
+
+
+class Metrics:
+    """Process-wide counters and histograms, shared by every session.
+
+    Stage latencies go into one histogram per stage name (`time`,
+    `observe`), everything countable into `counters` (`inc`), and byte
+    sizes into `sizes`. Updates take a lock, so reruns of several sessions
+    can report at once. `flush` hands a snapshot to every sink; sinks that
+    are scraped instead (PrometheusSink) read the registry directly.
+    """
+
+    def __init__(self, sinks=()):
+        self.sinks = list(sinks)
+        self.latency = {}
+        self.sizes = {}
+        self.counters = Counter()
+        self.started = time.time()
+        self._lock = threading.Lock()
+        for sink in self.sinks:
+            sink.attach(self)
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self.latency.get(stage)
+            if histogram is None:
+                histogram = self.latency[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def observe_size(self, name, size):
+        with self._lock:
+            histogram = self.sizes.get(name)
+            if histogram is None:
+                histogram = self.sizes[name] = Histogram(SIZE_BUCKETS)
+            histogram.observe(size)
+
+    def inc(self, name, amount=1):
+        if amount:
+            with self._lock:
+                self.counters[name] += amount
+
+    @contextmanager
+    def time(self, stage):
+        """Time the body of a `with` block as one observation of `stage`"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def snapshot(self):
+        """Everything recorded so far as plain JSON-serialisable values"""
+        with self._lock:
+            return {
+                'time': time.time(),
+                'uptime': time.time() - self.started,
+                'counters': dict(self.counters),
+                'latency': {stage: h.to_dict() for stage, h in self.latency.items()},
+                'sizes': {name: h.to_dict() for name, h in self.sizes.items()}
+            }
+
+    def flush(self):
+        if self.sinks:
+            snapshot = self.snapshot()
+            for sink in self.sinks:
+                sink.emit(snapshot)
+
+    def prometheus_text(self, prefix="snake"):
+        """The registry in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"# TYPE {prefix}_{name}_total counter")
+                lines.append(f"{prefix}_{name}_total {value}")
+            for metric, label, histograms in (
+                    ('stage_seconds', 'stage', self.latency),
+                    ('payload_bytes', 'payload', self.sizes)):
+                if not histograms:
+                    continue
+                lines.append(f"# TYPE {prefix}_{metric} histogram")
+                for key, h in sorted(histograms.items()):
+                    seen = 0
+                    for bound, n in zip([*map(str, h.bounds), '+Inf'], h.counts):
+                        seen += n
+                        lines.append(f'{prefix}_{metric}_bucket{{{label}="{key}",le="{bound}"}} {seen}')
+                    lines.append(f'{prefix}_{metric}_sum{{{label}="{key}"}} {h.sum}')
+                    lines.append(f'{prefix}_{metric}_count{{{label}="{key}"}} {h.count}')
+        return "\n".join(lines) + "\n"
+
+
+class MemorySink:
+    """Keeps the last `maxlen` snapshots in memory, e.g. for tests or a debug panel"""
+
+    def __init__(self, maxlen=100):
+        self.snapshots = deque(maxlen=maxlen)
+
+    def attach(self, metrics):
+        pass
+
+    def emit(self, snapshot):
+        self.snapshots.append(snapshot)
+
+    @property
+    def last(self):
+        return self.snapshots[-1] if self.snapshots else None
+
+
+class JsonlSink:
+    """Appends one snapshot per line to `path`, at most every `interval` seconds"""
+
+    def __init__(self, path, interval=10.0):
+        self.path = path
+        self.interval = interval
+        self._last = 0.0
+        self._lock = threading.Lock()
+
+    def attach(self, metrics):
+        pass
+
+    def emit(self, snapshot):
+        with self._lock:
+            if snapshot['time'] - self._last < self.interval:
+                return
+            self._last = snapshot['time']
+            with open(self.path, "a") as f:
+                f.write(json.dumps(snapshot) + "\n")
+
+
+class PrometheusSink:
+    """Serves the registry as Prometheus text on http://host:port/metrics.
+
+    A small stand-in for a real exporter: a ThreadingHTTPServer on a daemon
+    thread, started when the sink is attached to a Metrics registry.
+    """
+
+    def __init__(self, port=9464, host="127.0.0.1"):
+        self.host = host
+        self.port = port
+        self.server = None
+
+    def attach(self, metrics):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus_text().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True,
+                         name="metrics-http").start()
+
+    def emit(self, snapshot):
+        pass  # scraped, not pushed
+
+    def close(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+def make_sink(spec):
+    """Build a sink from a short spec: `memory`, `jsonl:PATH` or `prometheus[:PORT]`"""
+    kind, _, arg = spec.partition(":")
+    if kind == "memory":
+        return MemorySink()
+    if kind == "jsonl":
+        return JsonlSink(arg or "snake_metrics.jsonl")
+    if kind == "prometheus":
+        return PrometheusSink(int(arg) if arg else 9464)
+    raise ValueError(f"unknown metrics sink {spec!r}")
+
+
+def _timed(metrics, stage, method):
+    @wraps(method)
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            metrics.observe(stage, time.perf_counter() - start)
+    return timed
+
+
+# Engine methods timed by instrument(), and the stage each reports as
+INSTRUMENTED_STAGES = {
+    'move_snake': 'move_snake',
+    'move_human': 'move_human',
+    'generate_human': 'respawn'
+}
+
+_instrumented_classes = {}
+
+
+def instrument(game, metrics):
+    """Time the engine stages of `game` into `metrics`.
+
+    Switches this one instance to a subclass whose methods listed in
+    INSTRUMENTED_STAGES are timed, so games that are not instrumented pay
+    nothing. Stage times are inclusive: `move_snake` contains the
+    `move_human` and `respawn` calls it makes. Instrumenting again
+    replaces the previous metrics.
+    """
+    uninstrument(game)
+    cls = type(game)
+    timed_cls = _instrumented_classes.get((cls, metrics))
+    if timed_cls is None:
+        methods = {method: _timed(metrics, stage, getattr(cls, method))
+                   for method, stage in INSTRUMENTED_STAGES.items()}
+        timed_cls = type(f"Instrumented{cls.__name__}", (cls,),
+                         {'__slots__': (), '_uninstrumented': cls, **methods})
+        _instrumented_classes[(cls, metrics)] = timed_cls
+    game.__class__ = timed_cls
+    return game
+
+
+def uninstrument(game):
+    cls = getattr(type(game), '_uninstrumented', None)
+    if cls is not None:
+        game.__class__ = cls
+    return game
+
+
+class SamplingProfiler:
+    """Statistical profiler for one thread.
+
+    A daemon thread looks at the target thread's current stack every
+    `interval` seconds and counts the functions it finds, so the cost is
+    paid by the sampler rather than the profiled code. Samples accumulate
+    across start/stop pairs, e.g. over many reruns.
+    """
+
+    def __init__(self, interval=0.001, max_depth=32):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples = 0
+        self.self_counts = Counter()
+        self.total_counts = Counter()
+        self._stop = None
+
+    def start(self, thread_id=None):
+        if self._stop is not None:
+            return
+        target = thread_id or threading.get_ident()
+        self._stop = threading.Event()
+        threading.Thread(target=self._run, args=(target, self._stop), daemon=True,
+                         name="sampling-profiler").start()
+
+    def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
+
+    @contextmanager
+    def profiling(self):
+        self.start()
+        try:
+            yield self
+        finally:
+            self.stop()
+
+    def _run(self, target, stop):
+        while not stop.wait(self.interval):
+            frame = sys._current_frames().get(target)
+            if frame is None:
+                return
+            self.samples += 1
+            seen = set()
+            first = True
+            depth = 0
+            while frame is not None and depth < self.max_depth:
+                code = frame.f_code
+                where = f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})"
+                if first:
+                    self.self_counts[where] += 1
+                    first = False
+                if where not in seen:
+                    self.total_counts[where] += 1
+                    seen.add(where)
+                frame = frame.f_back
+                depth += 1
+
+    def top(self, n=15):
+        """The `n` hottest functions as (function, self %, total %) rows"""
+        if not self.samples:
+            return []
+        return [(where, 100 * count / self.samples, 100 * self.total_counts[where] / self.samples)
+                for where, count in self.self_counts.most_common(n)]
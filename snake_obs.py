@@ -0,0 +1,135 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from snake_engine import (
+    HUMAN, SNAKE_HEAD, SNAKE_BODY, BOUNDARY, MOUNTAIN, TREE, HOUSE, WATER
+)
+
+# One observation channel per occupancy code; empty cells are all zeros
+CHANNELS = ('head', 'body', 'human', 'boundary', 'mountains', 'trees', 'houses', 'water')
+CHANNEL_CODES = np.array([SNAKE_HEAD, SNAKE_BODY, HUMAN, BOUNDARY, MOUNTAIN, TREE, HOUSE, WATER],
+                         dtype=np.uint8)
+
+# Channel of each code, -1 for codes without one
+CODE_CHANNEL = np.full(256, -1, dtype=np.int64)
+CODE_CHANNEL[CHANNEL_CODES] = np.arange(len(CHANNELS))
+
+
+def one_hot(grids, out=None):
+    """Channels of a (G, G) grid or a (N, G, G) stack, e.g. VecSnakeEnv.grid.
+
+    Returns (C, G, G) or (N, C, G, G), written into `out` when given (any
+    numeric dtype) without a temporary.
+    """
+    channels = CHANNEL_CODES.reshape(-1, 1, 1)
+    if grids.ndim == 3:
+        grids = grids[:, None]
+    return np.equal(grids, channels, out=out, casting='unsafe')
+
+
+def observation_shape(num_games, grid_size, view=None):
+    """Shape of an Observer's batch: (N, C, S, S), S being the grid or the view size"""
+    return (num_games, len(CHANNELS), view or grid_size, view or grid_size)
+
+
+def shared_buffer(shape, dtype=np.uint8, name=None):
+    """An array in `multiprocessing.shared_memory`, as (array, shm).
+
+    Creates a new block when `name` is None, otherwise attaches to the
+    block of that name, e.g. one created by the trainer and passed to a
+    worker. Keep `shm` alive as long as the array is used, then `close()`
+    it; the creator also calls `unlink()`.
+    """
+    nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+    if name is None:
+        shm = shared_memory.SharedMemory(create=True, size=nbytes)
+    else:
+        shm = shared_memory.SharedMemory(name=name)
+    return np.ndarray(shape, dtype=dtype, buffer=shm.buf), shm
+
+
+class Observer:
+    """Multi-channel observations of a batch of games, updated in place.
+
+    `out` (N, C, S, S) holds one observation per game, with the channels
+    in CHANNELS. It can be any preallocated array, such as one from
+    shared_buffer, so workers can fill a trainer's batch without copying
+    or pickling. Without `view` each observation is the whole board; with
+    it, a `view` x `view` crop centred on the snake's head, where cells
+    off the board count as boundary.
+
+    Games must record their changes (`record_changes=True`). `update`
+    drains each game's change log and rewrites only the changed cells, so
+    a tick costs a few cell writes per game whatever the board size. The
+    board is redrawn in full after `reset` (a new game_id); call
+    `refresh` after `set_state`, which keeps the game_id. Nothing else
+    should drain the games' change logs.
+    """
+
+    def __init__(self, games, view=None, out=None, dtype=np.uint8):
+        self.games = list(games)
+        self.grid_size = self.games[0].grid_size
+        self.view = view
+        shape = observation_shape(len(self.games), self.grid_size, view)
+        self.out = np.zeros(shape, dtype=dtype) if out is None else out
+        if self.out.shape != shape:
+            raise ValueError(f"observation buffer has shape {self.out.shape}, not {shape}")
+
+        if view is None:
+            # Full boards are kept right in the output buffer
+            self.pad = 0
+            self.board = self.out
+        else:
+            self.pad = view // 2
+            size = self.grid_size + 2 * self.pad
+            self.board = np.zeros((len(self.games), len(CHANNELS), size, size), dtype=dtype)
+            self.board[:, CHANNELS.index('boundary')] = 1
+        self.game_ids = [None] * len(self.games)
+        self.refresh()
+
+    def refresh(self, index=None):
+        """Redraw every game (or game `index`) from its grid"""
+        for i in range(len(self.games)) if index is None else (index,):
+            self._redraw(i)
+        if self.view is not None:
+            self._crop()
+        return self.out
+
+    def _redraw(self, i):
+        game = self.games[i]
+        p, size = self.pad, self.grid_size
+        one_hot(game.grid, self.board[i, :, p:p + size, p:p + size])
+        game.drain_changes()
+        self.game_ids[i] = game.game_id
+
+    def update(self):
+        """Apply every game's changes since the last update; returns `out`"""
+        index, xs, ys, codes = [], [], [], []
+        for i, game in enumerate(self.games):
+            if game.game_id != self.game_ids[i]:
+                self._redraw(i)
+                continue
+            grid = game.grid
+            # A cell can change twice in one tick; its code now is what counts
+            for x, y, _ in game.drain_changes():
+                index.append(i)
+                xs.append(x)
+                ys.append(y)
+                codes.append(grid[y, x])
+
+        if index:
+            index, ys, xs = np.array(index), np.array(ys) + self.pad, np.array(xs) + self.pad
+            channels = CODE_CHANNEL[codes]
+            self.board[index, :, ys, xs] = 0
+            filled = channels >= 0
+            self.board[index[filled], channels[filled], ys[filled], xs[filled]] = 1
+        if self.view is not None:
+            self._crop()
+        return self.out
+
+    def _crop(self):
+        view, offset = self.view, self.pad - self.view // 2
+        for i, game in enumerate(self.games):
+            x, y = game.snake.head
+            self.out[i] = self.board[i, :, y + offset:y + offset + view, x + offset:x + offset + view]
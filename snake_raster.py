@@ -0,0 +1,224 @@
+"""Headless rasterizer for Snake boards, replays and thumbnails.
+
+Turns occupancy grids into images with NumPy alone: every cell code has a
+pre-baked sprite tile of palette indices, a frame is one gather of tiles,
+and replays are drawn incrementally from the change log, so whole games
+stream into an encoder at hundreds of frames per second:
+
+    python snake_raster.py game.snkr --gif game.gif           # animate a replay
+    python snake_raster.py game.snkr --png end.png --tick -1  # one frame
+    python snake_raster.py --seed 42 --png map.png --cell 4   # a fresh map
+
+Writing PNG and GIF files needs Pillow (`pip install pillow`).
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from snake_engine import (
+    SnakeGame, EMPTY, HUMAN, SNAKE_HEAD, SNAKE_BODY, BOUNDARY, MOUNTAIN, TREE, HOUSE, WATER
+)
+from snake_replay import Replay
+
+# Every colour a frame can use; frames hold indices into this palette, so
+# GIFs need no quantising
+PALETTE = np.array([
+    (142, 196, 96),    # 0 grass
+    (38, 120, 48),     # 1 snake green
+    (94, 176, 70),     # 2 light snake green
+    (20, 20, 20),      # 3 eyes, outlines
+    (236, 190, 150),   # 4 skin
+    (200, 60, 60),     # 5 red (shirt, roof)
+    (120, 120, 130),   # 6 rock
+    (245, 245, 250),   # 7 snow
+    (40, 110, 40),     # 8 leaves
+    (110, 70, 30),     # 9 trunk, boundary wood
+    (230, 210, 160),   # 10 wall
+    (60, 130, 220),    # 11 water
+    (150, 200, 250),   # 12 highlight
+], dtype=np.uint8)
+
+GRASS, SNAKE, SNAKE_LIGHT, DARK, SKIN, RED, ROCK, SNOW, LEAVES, WOOD, WALL, BLUE, LIGHT = range(13)
+
+# Flat colour per cell code, for thumbnails without sprites
+CODE_COLOURS = {EMPTY: GRASS, HUMAN: RED, SNAKE_HEAD: SNAKE, SNAKE_BODY: SNAKE_LIGHT,
+                BOUNDARY: WOOD, MOUNTAIN: ROCK, TREE: LEAVES, HOUSE: WALL, WATER: BLUE}
+
+
+def _sprite(code, cell):
+    """A `cell` x `cell` tile of palette indices drawing `code`"""
+    tile = np.full((cell, cell), GRASS, dtype=np.uint8)
+    # Pixel centres in [-1, 1], y pointing down
+    y, x = (np.mgrid[0:cell, 0:cell] + 0.5) / cell * 2 - 1
+    disk = x ** 2 + y ** 2
+
+    if code == SNAKE_HEAD:
+        tile[disk <= 0.8] = SNAKE
+        tile[((x - 0.3) ** 2 + (y + 0.25) ** 2 <= 0.04) | ((x + 0.3) ** 2 + (y + 0.25) ** 2 <= 0.04)] = DARK
+    elif code == SNAKE_BODY:
+        tile[disk <= 0.6] = SNAKE_LIGHT
+    elif code == HUMAN:
+        tile[(np.abs(x) <= 0.45) & (y >= 0.0) & (y <= 0.9)] = RED
+        tile[x ** 2 + (y + 0.4) ** 2 <= 0.14] = SKIN
+    elif code == MOUNTAIN:
+        tile[(y >= -0.8 + 1.6 * np.abs(x)) & (y <= 0.85)] = ROCK
+        tile[(y >= -0.8 + 1.6 * np.abs(x)) & (y <= -0.35)] = SNOW
+    elif code == TREE:
+        tile[(np.abs(x) <= 0.15) & (y >= 0.2) & (y <= 0.9)] = WOOD
+        tile[x ** 2 + (y + 0.2) ** 2 <= 0.42] = LEAVES
+    elif code == HOUSE:
+        tile[(np.abs(x) <= 0.6) & (y >= -0.1) & (y <= 0.85)] = WALL
+        tile[(y >= -0.85 + 0.9 * np.abs(x)) & (y < -0.1)] = RED
+        tile[(np.abs(x) <= 0.15) & (y >= 0.35) & (y <= 0.85)] = WOOD
+    elif code == WATER:
+        tile[(x ** 2 + (y - 0.2) ** 2 <= 0.4) | ((y < 0.2) & (y >= -0.9 + 2.2 * np.abs(x)))] = BLUE
+        tile[(x + 0.2) ** 2 + (y - 0.2) ** 2 <= 0.03] = LIGHT
+    elif code == BOUNDARY:
+        tile[:] = WOOD
+        tile[(np.abs(y) <= 0.1) | (np.abs(x) <= 0.1)] = DARK
+    return tile
+
+
+class Rasterizer:
+    """Draws grids as frames of PALETTE indices, `cell` pixels per cell.
+
+    `tiles[code]` is the sprite of each cell code, built once. `frame`
+    gathers the tiles of a whole grid in one NumPy indexing operation;
+    `thumbnail` uses one flat colour per cell, scaled up with np.repeat.
+    Call `rgb` on a frame for RGB pixels.
+    """
+
+    def __init__(self, cell=8):
+        self.cell = cell
+        self.tiles = np.zeros((256, cell, cell), dtype=np.uint8)
+        for code in CODE_COLOURS:
+            self.tiles[code] = _sprite(code, cell)
+        self.colours = np.zeros(256, dtype=np.uint8)
+        for code, colour in CODE_COLOURS.items():
+            self.colours[code] = colour
+
+    def frame(self, grid, out=None):
+        """The (G*cell, G*cell) frame of `grid`, written into `out` when given"""
+        size, cell = grid.shape[0], self.cell
+        tiles = self.tiles[grid]  # (G, G, cell, cell)
+        if out is None:
+            out = np.empty((size * cell, size * cell), dtype=np.uint8)
+        out.reshape(size, cell, size, cell)[:] = tiles.transpose(0, 2, 1, 3)
+        return out
+
+    def patch(self, frame, changes, grid):
+        """Redraw only the cells in `changes` (a change log) onto `frame`"""
+        cell, tiles = self.cell, self.tiles
+        for x, y, _ in changes:
+            frame[y * cell:(y + 1) * cell, x * cell:(x + 1) * cell] = tiles[grid[y, x]]
+        return frame
+
+    def thumbnail(self, grid, scale=2):
+        """A flat-colour frame, `scale` pixels per cell"""
+        flat = self.colours[grid]
+        return np.repeat(np.repeat(flat, scale, axis=0), scale, axis=1)
+
+    @staticmethod
+    def rgb(frame):
+        """(H, W, 3) RGB pixels of a frame"""
+        return PALETTE[frame]
+
+    def replay_frames(self, replay, every=1, start=0, stop=None):
+        """Frames of a Replay from input `start` to `stop`, one per `every` ticks.
+
+        The same array is updated in place and yielded each time; copy it
+        to keep a frame. Only the cells that changed since the previous
+        frame are redrawn.
+        """
+        stop = len(replay) if stop is None else min(stop, len(replay))
+        game = replay.seek(start, record_changes=True)
+        game.drain_changes()
+        frame = self.frame(game.grid)
+        yield frame
+        for tick in range(start, stop):
+            replay.step(game, tick)
+            if (tick - start + 1) % every == 0 or tick == stop - 1:
+                self.patch(frame, game.drain_changes(), game.grid)
+                yield frame
+
+
+def _image(frame):
+    try:
+        from PIL import Image
+    except ImportError:
+        raise RuntimeError("writing images needs `pip install pillow`") from None
+    # fromarray shares the array's memory, and replay_frames reuses one array
+    image = Image.fromarray(frame.copy(), mode="P")
+    image.putpalette(PALETTE.tobytes())
+    return image
+
+
+def save_png(frame, path):
+    _image(frame).save(path, optimize=False)
+
+
+def save_gif(frames, path, frame_ms=100):
+    """Write indexed frames (any iterable) to an animated GIF; returns the frame count.
+
+    Each frame is copied as it arrives and handed straight to the
+    encoder, so replay_frames, which updates one array in place, can feed
+    this directly.
+    """
+    frames = iter(frames)
+    first = next(frames, None)
+    if first is None:
+        return 0
+    count = 1
+
+    def rest():
+        nonlocal count
+        for frame in frames:
+            count += 1
+            yield _image(frame)
+
+    _image(first).save(path, save_all=True, append_images=rest(), duration=frame_ms, loop=0,
+                       optimize=False, disposal=1)
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("replay", nargs="?", help="a .snkr replay file")
+    parser.add_argument("--seed", type=int, help="draw the start of a new game on this seed instead")
+    parser.add_argument("--png", help="write one frame to this file")
+    parser.add_argument("--gif", help="write the replay to this animated GIF")
+    parser.add_argument("--tick", type=int, default=0, help="tick of the --png frame (-1 for the last)")
+    parser.add_argument("--every", type=int, default=1, help="GIF frame every this many ticks")
+    parser.add_argument("--cell", type=int, default=8, help="pixels per cell")
+    parser.add_argument("--frame-ms", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    rasterizer = Rasterizer(args.cell)
+    if args.replay:
+        with open(args.replay, "rb") as f:
+            replay = Replay(f.read())
+    elif args.seed is not None:
+        replay = None
+    else:
+        parser.error("give a replay file or --seed")
+
+    if args.png:
+        if replay is None:
+            grid = SnakeGame(seed=args.seed).grid
+        else:
+            grid = replay.seek(len(replay) if args.tick < 0 else args.tick).grid
+        save_png(rasterizer.frame(grid), args.png)
+    if args.gif:
+        if replay is None:
+            parser.error("--gif needs a replay")
+        start = time.perf_counter()
+        count = save_gif(rasterizer.replay_frames(replay, args.every), args.gif, args.frame_ms)
+        seconds = time.perf_counter() - start
+        print(f"{count} frames in {seconds:.2f}s ({count / seconds:.0f} fps)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
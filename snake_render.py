@@ -0,0 +1,168 @@
+import random
+from collections import OrderedDict
+
+from snake_engine import (
+    GRID_SIZE, EMPTY, HUMAN, SNAKE_HEAD, SNAKE_BODY, BOUNDARY, MOUNTAIN, TREE, HOUSE, WATER,
+    LANDSCAPE_CODES
+)
+
+# CSS classes for each occupancy code
+CELL_CLASSES = {
+    EMPTY: "cell",
+    HUMAN: "cell human",
+    SNAKE_HEAD: "cell snake-head",
+    SNAKE_BODY: "cell snake-body",
+    MOUNTAIN: "cell mountain",
+    TREE: "cell tree",
+    HOUSE: "cell house",
+    WATER: "cell water"
+}
+
+CELL_MARKUP = {code: f"<div class='{cls}'></div>" for code, cls in CELL_CLASSES.items()}
+
+# Boundary cells are drawn as either mountains or trees
+BOUNDARY_MARKUP = (CELL_MARKUP[MOUNTAIN], CELL_MARKUP[TREE])
+
+# Markup by code for code arrays, where boundaries have no per-map look
+CODE_MARKUP = {**CELL_MARKUP, BOUNDARY: CELL_MARKUP[MOUNTAIN]}
+
+# Emoji drawn on each kind of cell, with its font size in pixels
+CELL_EMOJI = {
+    SNAKE_HEAD: ("🐍", 16),
+    SNAKE_BODY: ("🟢", 14),
+    HUMAN: ("🧑", 16),
+    MOUNTAIN: ("🏔️", 16),
+    TREE: ("🌳", 16),
+    HOUSE: ("🏠", 16),
+    WATER: ("💧", 16)
+}
+
+_PAGE_CSS = (
+    ".game-container{display:flex;flex-direction:column;align-items:center;gap:20px}"
+    ".score{font-size:24px;font-weight:bold;color:#1f77b4}"
+    ".game-over{font-size:30px;color:#ff4b4b;text-align:center;margin:20px}"
+    ".win-message{font-size:30px;color:#28a745;text-align:center;margin:20px}"
+    ".grid{display:grid;grid-template-columns:repeat({size},20px);grid-template-rows:repeat({size},20px);"
+    "gap:1px;background-image:url('https://img.freepik.com/free-vector/game-ground-cartoon-landscape_107791-1852.jpg');"
+    "background-size:cover;padding:10px;border:10px solid #654321;border-radius:5px;position:relative}"
+    ".cell{width:20px;height:20px;border-radius:2px;background-color:transparent;position:relative}"
+    ".cell::before{position:absolute;top:50%;left:50%;transform:translate(-50%,-50%)}"
+    ".snake-head{border-radius:10px}"
+    ".snake-body{border-radius:5px}"
+    ".controls{display:flex;gap:10px;margin-top:20px}"
+    ".direction-button{width:50px;height:50px;font-size:20px;margin:5px}"
+)
+
+
+def page_css(grid_size=GRID_SIZE):
+    """The page's <style> block: layout, a `grid_size` grid and one emoji rule per cell class"""
+    emoji = "".join(f".{CELL_CLASSES[code].split()[-1]}::before{{content:'{char}';font-size:{size}px}}"
+                    for code, (char, size) in CELL_EMOJI.items())
+    return f"<style>{_PAGE_CSS.replace('{size}', str(grid_size))}{emoji}</style>"
+
+
+def grid_open(width, height):
+    """Opening tag of the grid; the page CSS sizes it for GRID_SIZE, anything else is set inline"""
+    if width == GRID_SIZE and height == GRID_SIZE:
+        return "<div class='grid'>"
+    return (f"<div class='grid' style='grid-template-columns: repeat({width}, 20px); "
+            f"grid-template-rows: repeat({height}, 20px)'>")
+
+
+class StaticLayer:
+    """Markup for the parts of a map that never change during a game"""
+
+    __slots__ = ('cells', 'rows')
+
+    def __init__(self, cells):
+        # cells[y][x] is the markup of one cell; rows[y] is that row joined
+        self.cells = cells
+        self.rows = ["".join(row) for row in cells]
+
+
+class GridRenderer:
+    """Builds the game grid HTML from a cached static layer.
+
+    The boundary and landscape are rendered once per map and kept in a
+    small LRU cache keyed by `SnakeGame.map_id`. Each frame only rebuilds
+    the rows that contain the snake or the human, so the work per frame
+    follows the number of moving entities rather than `grid_size ** 2`.
+    """
+
+    def __init__(self, max_maps=256):
+        self.max_maps = max_maps
+        self._layers = OrderedDict()
+
+    def static_layer(self, game):
+        layer = self._layers.get(game.map_id)
+        if layer is not None:
+            self._layers.move_to_end(game.map_id)
+            return layer
+
+        # Pick each boundary cell's look once per map so it stays stable
+        rng = random.Random(game.seed)
+        empty = CELL_MARKUP[EMPTY]
+        cells = [[empty] * game.grid_size for _ in range(game.grid_size)]
+        for x, y in game.obstacles:
+            cells[y][x] = rng.choice(BOUNDARY_MARKUP)
+        for kind, positions in game.landscape.items():
+            markup = CELL_MARKUP[LANDSCAPE_CODES[kind]]
+            for x, y in positions:
+                cells[y][x] = markup
+
+        layer = StaticLayer(cells)
+        self._layers[game.map_id] = layer
+        if len(self._layers) > self.max_maps:
+            self._layers.popitem(last=False)
+        return layer
+
+    def dynamic_rows(self, game, layer):
+        """Map of row -> cell markup list for the rows holding the snake or the human.
+
+        Each row starts as a copy of the static layer's row and the moving
+        entities are written straight into it.
+        """
+        rows = {}
+        static = layer.cells
+        body = CELL_MARKUP[SNAKE_BODY]
+        size = game.grid_size
+        for cell in game.snake.packed()[1:]:
+            y = cell // size
+            row = rows.get(y)
+            if row is None:
+                row = rows[y] = static[y].copy()
+            row[cell - y * size] = body
+
+        moving = [(game.snake.head, CELL_MARKUP[SNAKE_HEAD])]
+        if game.human:
+            moving.insert(0, (game.human, CELL_MARKUP[HUMAN]))
+        for (x, y), markup in moving:
+            row = rows.get(y)
+            if row is None:
+                row = rows[y] = static[y].copy()
+            row[x] = markup
+        return rows
+
+    def render(self, game):
+        """Return the full grid markup for the current frame"""
+        layer = self.static_layer(game)
+        # One join for the whole page: concatenating the joined rows copies
+        # every byte again, which costs more than the join on large grids
+        rows = [grid_open(game.grid_size, game.grid_size), *layer.rows, "</div>"]
+        for y, cells in self.dynamic_rows(game, layer).items():
+            rows[y + 1] = "".join(cells)
+        return "".join(rows)
+
+
+_default_renderer = GridRenderer()
+
+
+def render_grid(game):
+    """Render `game` with the process-wide renderer"""
+    return _default_renderer.render(game)
+
+
+def render_codes(codes):
+    """Render a (height, width) array of cell codes, e.g. a WorldGame viewport"""
+    height, width = codes.shape
+    return "".join([grid_open(width, height), *map(CODE_MARKUP.__getitem__, codes.ravel().tolist()), "</div>"])
@@ -0,0 +1,261 @@
+import struct
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from snake_engine import SnakeGame, generate_map, UP, DOWN, LEFT, RIGHT
+from snake_ai import FieldEscape
+from snake_arena import ArenaGame
+
+# Binary layout, all little-endian:
+#   header    magic, version, grid size, mountain/tree/house/water counts,
+#             seed, human policy, policy radius, keyframe interval, ticks
+#   summary   final score, snake moves, flags (1 = game over, 2 = win)
+#   inputs    one direction code per tick (see DIRECTIONS)
+#   keyframes count, then per keyframe its byte length and packed state
+# Replays hold seeds, not maps, so the version also changes whenever a seed
+# generates a different map: version 2 maps have walled-off landscape
+# repaired (see snake_engine.repair_landscape).
+MAGIC = b"SNKR"
+VERSION = 2
+_HEADER = struct.Struct("<4sBHHHHHqBBHI")
+_SUMMARY = struct.Struct("<iIB")
+_KEYFRAME = struct.Struct("<IBiBHHI")
+_U32 = struct.Struct("<I")
+_NONE = 0xFFFF
+_NO_FREE = 0xFFFFFFFF
+
+# Direction codes stored per tick, and per game in snapshots; 0 is "no input"
+DIRECTIONS = (None, UP, DOWN, LEFT, RIGHT)
+DIRECTION_CODES = {d: i for i, d in enumerate(DIRECTIONS)}
+
+# Human escape policies a replay can name
+GREEDY, FIELD = 0, 1
+
+
+def require_single_player(game):
+    """Reject games whose state get_state cannot capture"""
+    if isinstance(game, ArenaGame):
+        raise TypeError("arena games cannot be recorded or snapshotted")
+
+
+def policy_code(game):
+    """The (policy, radius) pair naming the human escape policy of `game`"""
+    policy = game.human_policy
+    if policy is None:
+        return GREEDY, 0
+    if isinstance(policy, FieldEscape):
+        return FIELD, policy.field.radius
+    raise ValueError(f"cannot record games using {type(policy).__name__}")
+
+
+def make_policy(code, radius):
+    """The human escape policy a policy_code pair names"""
+    return FieldEscape(radius) if code == FIELD else None
+
+
+def pack_keyframe(tick, game):
+    """Pack the state of `game` before input `tick` into bytes"""
+    state = game.get_state()
+    size = game.grid_size
+    human = state['human'] or (_NONE, _NONE)
+    flags = state['game_over'] | state['win'] << 1 | state['paused'] << 2
+    out = [_KEYFRAME.pack(tick, DIRECTION_CODES[state['direction']], state['score'],
+                          flags, human[0], human[1], state['ticks'])]
+
+    out.append(_U32.pack(len(state['snake'])))
+    out.append(array('I', [y * size + x for x, y in state['snake']]).tobytes())
+
+    version, words, gauss = state['rng_state']
+    out.append(array('I', words).tobytes())
+    out.append(struct.pack("<Bd", gauss is not None, gauss or 0.0))
+
+    free = state['free']
+    out.append(_U32.pack(_NO_FREE if free is None else len(free)))
+    if free is not None:
+        out.append(array('I', free).tobytes())
+    return b"".join(out)
+
+
+def unpack_keyframe(data, grid_size):
+    """Inverse of pack_keyframe: returns `(tick, state)`"""
+    tick, direction, score, flags, hx, hy, ticks = _KEYFRAME.unpack_from(data)
+    offset = _KEYFRAME.size
+
+    (length,) = _U32.unpack_from(data, offset)
+    offset += 4
+    cells = array('I', data[offset:offset + 4 * length])
+    offset += 4 * length
+
+    words = array('I', data[offset:offset + 4 * 625])
+    offset += 4 * 625
+    has_gauss, gauss = struct.unpack_from("<Bd", data, offset)
+    offset += 9
+
+    (free_len,) = _U32.unpack_from(data, offset)
+    offset += 4
+    free = None
+    if free_len != _NO_FREE:
+        free = array('I', data[offset:offset + 4 * free_len]).tolist()
+
+    state = {
+        'snake': [(c % grid_size, c // grid_size) for c in cells],
+        'direction': DIRECTIONS[direction],
+        'human': None if hx == _NONE else (hx, hy),
+        'score': score,
+        'game_over': bool(flags & 1),
+        'win': bool(flags & 2),
+        'paused': bool(flags & 4),
+        'ticks': ticks,
+        'rng_state': (3, tuple(words), gauss if has_gauss else None),
+        'free': free
+    }
+    return tick, state
+
+
+class ReplayRecorder:
+    """Records one game as seed, config and per-tick direction inputs.
+
+    Call `record()` right before every `game.step()`; it stores the
+    direction the snake is about to move in, which captures any number of
+    button presses between ticks. Every `keyframe_interval` ticks the full
+    state is stored as well, so a replay can seek without simulating from
+    the start.
+    """
+
+    def __init__(self, game, keyframe_interval=100):
+        require_single_player(game)
+        self.game = game
+        self.keyframe_interval = keyframe_interval
+        self.policy = policy_code(game)
+        self.inputs = bytearray()
+        self.keyframes = []
+
+    def record(self, game=None):
+        game = game or self.game
+        tick = len(self.inputs)
+        if tick % self.keyframe_interval == 0:
+            self.keyframes.append(pack_keyframe(tick, game))
+        self.inputs.append(DIRECTION_CODES[game.direction])
+
+    def step(self, action=None):
+        """Apply `action`, record the tick and step the game"""
+        if action is not None:
+            self.game.change_direction(action)
+        self.record()
+        return self.game.step()
+
+    def to_bytes(self):
+        game = self.game
+        counts = game.obstacle_count
+        out = [
+            _HEADER.pack(MAGIC, VERSION, game.grid_size, counts['mountain'], counts['tree'],
+                         counts['house'], counts['water'], game.seed, self.policy[0],
+                         self.policy[1], self.keyframe_interval, len(self.inputs)),
+            _SUMMARY.pack(game.score, game.ticks, game.game_over | game.win << 1),
+            bytes(self.inputs),
+            _U32.pack(len(self.keyframes))
+        ]
+        for keyframe in self.keyframes:
+            out.append(_U32.pack(len(keyframe)))
+            out.append(keyframe)
+        return b"".join(out)
+
+
+class Replay:
+    """A recorded game that can be re-simulated and seeked"""
+
+    def __init__(self, data):
+        (magic, version, self.grid_size, mountain, tree, house, water, self.seed, policy,
+         radius, self.keyframe_interval, num_ticks) = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("not a Snake replay")
+        if version != VERSION:
+            raise ValueError(f"unsupported replay version {version} (this build reads {VERSION})")
+        self.obstacle_count = {'mountain': mountain, 'tree': tree, 'house': house, 'water': water}
+        self.policy = (policy, radius)
+
+        offset = _HEADER.size
+        self.score, self.moves, flags = _SUMMARY.unpack_from(data, offset)
+        self.game_over, self.win = bool(flags & 1), bool(flags & 2)
+        offset += _SUMMARY.size
+
+        self.inputs = data[offset:offset + num_ticks]
+        offset += num_ticks
+
+        (count,) = _U32.unpack_from(data, offset)
+        offset += 4
+        self.keyframes = []
+        for _ in range(count):
+            (length,) = _U32.unpack_from(data, offset)
+            offset += 4
+            self.keyframes.append(data[offset:offset + length])
+            offset += length
+        self._map = None
+
+    def __len__(self):
+        return len(self.inputs)
+
+    def new_game(self, record_changes=False):
+        """A game at the start of this replay's seed, before any keyframe"""
+        if self._map is None:
+            self._map = generate_map(self.seed, self.grid_size, self.obstacle_count)
+        return SnakeGame(record_changes=record_changes, human_policy=make_policy(*self.policy),
+                         game_map=self._map)
+
+    def seek(self, tick, record_changes=False):
+        """The game as it was right before input `tick` was applied.
+
+        Restores the nearest keyframe at or before `tick` and simulates the
+        remaining inputs, so the cost is O(keyframe interval).
+        """
+        tick = max(0, min(tick, len(self.inputs)))
+        game = self.new_game(record_changes)
+        start = 0
+        index = min(tick // self.keyframe_interval, len(self.keyframes) - 1)
+        if index >= 0:
+            start, state = unpack_keyframe(self.keyframes[index], self.grid_size)
+            game.set_state(state)
+        self._run(game, start, tick)
+        return game
+
+    def simulate(self):
+        """Re-simulate the whole replay; returns the final game.
+
+        Starts from the first keyframe, the state the recording began in:
+        the seed's start for most games, but a restored game (see
+        snake_snapshot) is recorded from wherever it was restored.
+        """
+        game = self.seek(0)
+        self._run(game, 0, len(self.inputs))
+        return game
+
+    def step(self, game, tick):
+        """Advance `game` by input `tick`; returns `done`"""
+        direction = DIRECTIONS[self.inputs[tick]]
+        if direction is not None:
+            # The recorded direction is the one the snake moved in, possibly
+            # after several turns; replayed as one turn it could be rejected
+            # as a reversal
+            game.direction = direction
+        return game.step()
+
+    def _run(self, game, start, stop):
+        step = self.step
+        for tick in range(start, stop):
+            step(game, tick)
+
+    def verify(self):
+        """True when re-simulating reproduces the recorded result"""
+        game = self.simulate()
+        return (game.score, game.ticks, game.game_over, game.win) == \
+            (self.score, self.moves, self.game_over, self.win)
+
+
+def verify_replay(data):
+    return Replay(data).verify()
+
+
+def verify_replays(replays, workers=None, chunksize=64):
+    """Verify many replays in parallel; returns one bool per replay"""
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(verify_replay, replays, chunksize=chunksize))
@@ -0,0 +1,66 @@
+import time
+
+from snake_engine import MOVE_INTERVAL
+
+
+class TickScheduler:
+    """Fixed-timestep game loop driver.
+
+    Wall-clock time since the last call is added to an accumulator, and one
+    logical tick is due for every `interval` seconds in it. When the caller
+    falls behind (slow reruns, a loaded server) several ticks run in one
+    call so the game keeps its speed, but never more than `max_catch_up`;
+    anything beyond that is dropped and counted in `ticks_dropped`.
+    """
+
+    def __init__(self, interval=MOVE_INTERVAL, max_catch_up=5, clock=time.monotonic):
+        self.interval = interval
+        self.max_catch_up = max_catch_up
+        self.clock = clock
+        self.ticks_run = 0
+        self.ticks_dropped = 0
+        self.restart()
+
+    def restart(self):
+        """Forget elapsed time, e.g. after a reset or while paused"""
+        self.last_time = self.clock()
+        self.accumulator = 0.0
+
+    def due(self):
+        """Number of ticks to run now, consuming them from the accumulator"""
+        now = self.clock()
+        self.accumulator += now - self.last_time
+        self.last_time = now
+
+        ticks = int(self.accumulator // self.interval)
+        self.accumulator -= ticks * self.interval
+        if ticks > self.max_catch_up:
+            self.ticks_dropped += ticks - self.max_catch_up
+            ticks = self.max_catch_up
+        return ticks
+
+    def advance(self, game, before_tick=None):
+        """Step `game` by every tick that is due; returns the ticks run.
+
+        `before_tick(game)` is called right before each step, e.g. to
+        record replay inputs.
+        """
+        if game.paused or game.done:
+            self.restart()
+            return 0
+
+        ticks = self.due()
+        for i in range(ticks):
+            self.ticks_run += 1
+            if before_tick is not None:
+                before_tick(game)
+            if game.step():
+                self.restart()
+                return i + 1
+        return ticks
+
+    @property
+    def dropped_rate(self):
+        """Fraction of due ticks that were dropped instead of run"""
+        total = self.ticks_run + self.ticks_dropped
+        return self.ticks_dropped / total if total else 0.0
@@ -0,0 +1,363 @@
+"""Asyncio game server hosting many Snake rooms in one process.
+
+One scheduler ticks every room at MOVE_INTERVAL. Clients join a room,
+send direction inputs (batched per tick) and receive the board as one
+full frame followed by compact per-tick patches:
+
+    python snake_server.py --port 8765                # serve over WebSockets
+    python snake_server.py --simulate 2000 --seconds 10   # in-process load test
+
+Client messages are JSON objects:
+    {"type": "join", "room": "lobby", "play": true}
+    {"type": "input", "dir": "up"}
+    {"type": "restart"}
+    {"type": "resync"}
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from itertools import count
+
+from snake_engine import (
+    SnakeGame, GRID_SIZE, MOVE_INTERVAL, UP, DOWN, LEFT, RIGHT
+)
+from snake_arena import ArenaGame
+from snake_ai import FieldEscape
+from snake_frames import full_frame, patch_frame, apply_frame
+from snake_scheduler import TickScheduler
+
+DIRECTION_NAMES = {'up': UP, 'down': DOWN, 'left': LEFT, 'right': RIGHT}
+
+# Most players a client can ask a room to seat
+MAX_SEATS = 8
+
+
+def encode(message):
+    return json.dumps(message, separators=(',', ':'))
+
+
+class Connection:
+    """One client as the server sees it: an outbox of encoded messages.
+
+    The outbox is bounded so a slow client cannot hold up a room. Messages
+    that do not fit are dropped; the client sees the gap in frame sequence
+    numbers and asks for a resync.
+    """
+
+    _ids = count(1)
+
+    def __init__(self, max_queued=64):
+        self.id = next(self._ids)
+        self.outbox = asyncio.Queue(max_queued)
+        self.room = None
+        self.seat = None
+        self.dropped = 0
+
+    def send(self, text):
+        try:
+            self.outbox.put_nowait(text)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+
+class Room:
+    """One game plus the clients playing and watching it.
+
+    A room with one seat plays a SnakeGame; more seats play an ArenaGame
+    with one snake per seat. The game starts once every seat is taken.
+    Inputs arriving between ticks are batched: the last direction from
+    each seat is applied on the next tick.
+    """
+
+    def __init__(self, room_id, seats=1, grid_size=GRID_SIZE, obstacle_count=None, seed=None,
+                 human_policy=None):
+        self.room_id = room_id
+        self.seats = {}
+        self.clients = set()
+        self.inputs = {}
+        self.seq = 0
+        if seats == 1:
+            self.game = SnakeGame(grid_size, obstacle_count, seed, record_changes=True,
+                                  human_policy=human_policy)
+        else:
+            self.game = ArenaGame(range(seats), grid_size, obstacle_count, seed,
+                                  record_changes=True, human_policy=human_policy)
+        self.capacity = seats
+
+    @property
+    def started(self):
+        return len(self.seats) == self.capacity
+
+    def join(self, connection, play=True):
+        """Add a client, seating it when `play` and a seat is free"""
+        self.clients.add(connection)
+        connection.room = self
+        if play:
+            free = [seat for seat in range(self.capacity) if seat not in self.seats]
+            if free:
+                connection.seat = free[0]
+                self.seats[free[0]] = connection
+        connection.send(encode(self.welcome(connection)))
+
+    def leave(self, connection):
+        self.clients.discard(connection)
+        if connection.seat is not None and self.seats.get(connection.seat) is connection:
+            del self.seats[connection.seat]
+        connection.room = connection.seat = None
+
+    def welcome(self, connection):
+        return {'type': 'full', 'room': self.room_id, 'seat': connection.seat,
+                'frame': full_frame(self.game, self.seq), **self.status()}
+
+    def status(self):
+        game = self.game
+        scores = game.scores if isinstance(game, ArenaGame) else {0: game.score}
+        return {'tick': game.ticks, 'scores': scores, 'started': self.started,
+                'done': game.done, 'win': game.win}
+
+    def submit(self, connection, direction):
+        if connection.seat is not None:
+            self.inputs[connection.seat] = direction
+
+    def restart(self):
+        if self.game.done:
+            self.game.reset()
+            self.inputs.clear()
+            self.seq += 1
+            for connection in self.clients:
+                connection.send(encode(self.welcome(connection)))
+
+    def tick(self):
+        """Advance one tick and broadcast the changes; False when idle"""
+        game = self.game
+        if not self.started or game.done:
+            return False
+        if isinstance(game, ArenaGame):
+            game.step(self.inputs)
+        else:
+            game.step(self.inputs.get(0))
+        self.inputs.clear()
+
+        frame = patch_frame(game.drain_changes(), game.grid_size, self.seq)
+        self.seq = frame['seq']
+        text = encode({'type': 'tick', 'frame': frame, **self.status()})
+        for connection in self.clients:
+            connection.send(text)
+        return True
+
+
+class GameServer:
+    """All rooms of one process, ticked together by a single scheduler"""
+
+    def __init__(self, interval=MOVE_INTERVAL, max_catch_up=5, room_defaults=None):
+        self.rooms = {}
+        self.scheduler = TickScheduler(interval, max_catch_up)
+        self.room_defaults = room_defaults or {}
+        self.tick_seconds = 0.0
+        self.rooms_ticked = 0
+
+    def create_room(self, room_id, seats=1, **config):
+        room = self.rooms.get(room_id)
+        if room is None:
+            room = self.rooms[room_id] = Room(room_id, seats, **{**self.room_defaults, **config})
+        return room
+
+    def handle(self, connection, message):
+        """Apply one decoded client message"""
+        kind = message.get('type')
+        room = connection.room
+        if kind == 'join':
+            try:
+                seats = int(message.get('seats', 1))
+            except (TypeError, ValueError):
+                connection.send(encode({'type': 'error', 'error': f"bad seats {message.get('seats')!r}"}))
+                return
+            # Rooms are built on the event loop, so their size is capped
+            seats = min(max(seats, 1), MAX_SEATS)
+            self.leave(connection)
+            room = self.create_room(str(message.get('room', 'lobby')), seats)
+            room.join(connection, bool(message.get('play', True)))
+        elif room is None:
+            connection.send(encode({'type': 'error', 'error': 'join a room first'}))
+        elif kind == 'input' and message.get('dir') in DIRECTION_NAMES:
+            room.submit(connection, DIRECTION_NAMES[message['dir']])
+        elif kind == 'restart':
+            room.restart()
+        elif kind == 'resync':
+            connection.send(encode(room.welcome(connection)))
+        else:
+            connection.send(encode({'type': 'error', 'error': f'bad message {message!r}'}))
+
+    def leave(self, connection):
+        if connection.room is not None:
+            room = connection.room
+            room.leave(connection)
+            if not room.clients:
+                del self.rooms[room.room_id]
+
+    def tick(self):
+        """One tick of every room"""
+        start = time.perf_counter()
+        ticked = 0
+        for room in list(self.rooms.values()):
+            ticked += room.tick()
+        self.rooms_ticked += ticked
+        self.tick_seconds = time.perf_counter() - start
+
+    async def run(self):
+        """Tick all rooms forever at the scheduler's interval"""
+        scheduler = self.scheduler
+        scheduler.restart()
+        while True:
+            for _ in range(scheduler.due()):
+                self.tick()
+            await asyncio.sleep(max(0.0, scheduler.interval - scheduler.accumulator))
+
+
+class LocalClient(Connection):
+    """In-process client for tests and load generation.
+
+    Talks to a GameServer without a network in between, but through the
+    same encoded messages, and keeps its own copy of the board from the
+    frames it receives, asking for a resync when it misses one.
+    """
+
+    def __init__(self, server, max_queued=64):
+        super().__init__(max_queued)
+        self.server = server
+        self.board = {}
+        self.state = {}
+        self.resyncs = 0
+
+    def join(self, room_id="lobby", play=True, seats=1):
+        self.server.handle(self, {'type': 'join', 'room': room_id, 'play': play, 'seats': seats})
+
+    def press(self, direction):
+        self.server.handle(self, {'type': 'input', 'dir': direction})
+
+    def restart(self):
+        self.server.handle(self, {'type': 'restart'})
+
+    def receive_pending(self):
+        """Apply every message waiting in the outbox; returns how many there were"""
+        received = 0
+        while not self.outbox.empty():
+            self._apply(json.loads(self.outbox.get_nowait()))
+            received += 1
+        return received
+
+    async def receive(self):
+        """Wait for and apply the next message"""
+        message = json.loads(await self.outbox.get())
+        self._apply(message)
+        return message
+
+    def _apply(self, message):
+        if 'frame' not in message:
+            self.state = message
+            return
+        self.state = message
+        if not apply_frame(self.board, message['frame']):
+            self.resyncs += 1
+            self.server.handle(self, {'type': 'resync'})
+
+
+async def serve_websockets(server, host="127.0.0.1", port=8765):
+    """Serve `server` over WebSockets; needs the optional `websockets` package"""
+    try:
+        from websockets.asyncio.server import serve
+    except ImportError:
+        raise RuntimeError("serving over WebSockets needs `pip install websockets`") from None
+
+    async def handler(websocket):
+        connection = Connection()
+
+        async def pump():
+            while True:
+                await websocket.send(await connection.outbox.get())
+
+        writer = asyncio.create_task(pump())
+        try:
+            async for text in websocket:
+                try:
+                    message = json.loads(text)
+                except ValueError:
+                    message = {}
+                server.handle(connection, message if isinstance(message, dict) else {})
+        finally:
+            writer.cancel()
+            server.leave(connection)
+
+    return await serve(handler, host, port)
+
+
+async def simulate(num_rooms, seconds, interval=MOVE_INTERVAL):
+    """Load test: `num_rooms` single-player rooms driven by autopilot clients"""
+    from snake_bots import Autopilot
+
+    server = GameServer(interval)
+    clients = []
+    for i in range(num_rooms):
+        client = LocalClient(server)
+        client.join(f"room-{i}")
+        clients.append((client, Autopilot()))
+    runner = asyncio.create_task(server.run())
+
+    names = {direction: name for name, direction in DIRECTION_NAMES.items()}
+    worst = 0.0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        await asyncio.sleep(interval / 2)
+        worst = max(worst, server.tick_seconds)
+        for client, pilot in clients:
+            client.receive_pending()
+            game = client.room.game
+            if game.done:
+                client.restart()
+            else:
+                direction = pilot.choose(game)
+                if direction:
+                    client.press(names[direction])
+    runner.cancel()
+
+    scheduler = server.scheduler
+    return {
+        'rooms': num_rooms,
+        'room_ticks_per_sec': server.rooms_ticked / seconds,
+        'worst_tick_ms': worst * 1000,
+        'ticks_dropped': scheduler.ticks_dropped,
+        'resyncs': sum(client.resyncs for client, _ in clients)
+    }
+
+
+async def serve_forever(args):
+    server = GameServer(room_defaults={'grid_size': args.grid_size,
+                                       'human_policy': FieldEscape() if args.field else None})
+    websocket_server = await serve_websockets(server, args.host, args.port)
+    print(f"serving on ws://{args.host}:{args.port}", file=sys.stderr)
+    async with websocket_server:
+        await server.run()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--grid-size", type=int, default=GRID_SIZE)
+    parser.add_argument("--field", action="store_true", help="villagers use the distance-field escape")
+    parser.add_argument("--simulate", type=int, metavar="ROOMS",
+                        help="run an in-process load test with this many rooms instead of serving")
+    parser.add_argument("--seconds", type=float, default=10.0, help="length of the load test")
+    args = parser.parse_args(argv)
+
+    if args.simulate:
+        print(json.dumps(asyncio.run(simulate(args.simulate, args.seconds)), indent=2))
+    else:
+        asyncio.run(serve_forever(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
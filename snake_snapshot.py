@@ -0,0 +1,255 @@
+import io
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+from snake_engine import SnakeGame, generate_map
+from snake_replay import (
+    DIRECTIONS, DIRECTION_CODES, policy_code, make_policy, require_single_player
+)
+
+# Snapshots are uncompressed .npz files holding one column per field, with
+# one row per game (see capture). Bump the version on any layout change, and
+# whenever a seed generates a different map, as maps are rebuilt from seeds:
+# version 2 maps have walled-off landscape repaired.
+SNAPSHOT_VERSION = 2
+
+# Flag bits of the `flags` column
+GAME_OVER, WIN, PAUSED, HAS_GAUSS, HAS_FREE = 1, 2, 4, 8, 16
+
+# The 625 words of a random.Random state; packing them is the costliest
+# part of a capture, and struct is about twice as fast as array or NumPy
+_RNG_WORDS = struct.Struct("<625I")
+
+
+def _ragged(arrays):
+    """Concatenate 1-D uint32 arrays; returns (values, offsets)"""
+    offsets = np.zeros(len(arrays) + 1, dtype=np.int64)
+    np.cumsum([len(a) for a in arrays], out=offsets[1:])
+    values = np.concatenate(arrays) if arrays else np.zeros(0, dtype=np.uint32)
+    return values.astype(np.uint32, copy=False), offsets
+
+
+def capture(games):
+    """The state of every game in `games` as a dict of NumPy columns.
+
+    Holds everything SnakeGame.get_state does plus the map parameters, so
+    a game can be rebuilt without anything else. Variable-length fields
+    (snake, free cells) are stored flat with an offsets column. SnakeGames
+    only: arena games raise TypeError, as they have no get_state support.
+    """
+    for game in games:
+        require_single_player(game)
+    n = len(games)
+    seed = np.empty(n, dtype=np.int64)
+    grid_size = np.empty(n, dtype=np.uint16)
+    counts = np.empty((n, 4), dtype=np.uint16)
+    policy = np.empty((n, 2), dtype=np.uint8)
+    direction = np.empty(n, dtype=np.uint8)
+    human = np.full((n, 2), -1, dtype=np.int32)
+    score = np.empty(n, dtype=np.int32)
+    ticks = np.empty(n, dtype=np.uint32)
+    flags = np.zeros(n, dtype=np.uint8)
+    cause = []
+    rng_words = []
+    rng_gauss = np.zeros(n, dtype=np.float64)
+    snakes = []
+    free = []
+
+    for i, game in enumerate(games):
+        seed[i] = game.seed
+        grid_size[i] = game.grid_size
+        c = game.obstacle_count
+        counts[i] = c['mountain'], c['tree'], c['house'], c['water']
+        policy[i] = policy_code(game)
+        direction[i] = DIRECTION_CODES[game.direction]
+        if game.human:
+            human[i] = game.human
+        score[i] = game.score
+        ticks[i] = game.ticks
+        cause.append(game.cause or '')
+        _, words, gauss = game.rng.getstate()
+        rng_words.append(_RNG_WORDS.pack(*words))
+        bits = game.game_over | game.win << 1 | game.paused << 2
+        if gauss is not None:
+            rng_gauss[i] = gauss
+            bits |= HAS_GAUSS
+        snakes.append(np.frombuffer(game.snake.packed(), dtype=np.uint32))
+        if game.free is not None:
+            free.append(np.frombuffer(game.free._cells, dtype=np.uint32))
+            bits |= HAS_FREE
+        else:
+            free.append(np.zeros(0, dtype=np.uint32))
+        flags[i] = bits
+
+    snake_cells, snake_offsets = _ragged(snakes)
+    free_cells, free_offsets = _ragged(free)
+    return {
+        'version': np.array(SNAPSHOT_VERSION, dtype=np.uint16),
+        'seed': seed, 'grid_size': grid_size, 'obstacle_count': counts, 'policy': policy,
+        'direction': direction, 'human': human, 'score': score, 'ticks': ticks,
+        'flags': flags, 'cause': np.array(cause, dtype='U16'),
+        'rng_words': np.frombuffer(b''.join(rng_words), dtype='<u4').reshape(n, 625),
+        'rng_gauss': rng_gauss,
+        'snake_cells': snake_cells, 'snake_offsets': snake_offsets,
+        'free_cells': free_cells, 'free_offsets': free_offsets
+    }
+
+
+def restore(columns, maps=None, record_changes=False):
+    """Rebuild the games of a `capture` result, in order.
+
+    Maps are regenerated from their seeds once per distinct map; pass a
+    dict as `maps` to reuse them across calls.
+    """
+    if int(columns['version']) != SNAPSHOT_VERSION:
+        raise ValueError(f"unsupported snapshot version {int(columns['version'])}")
+    maps = {} if maps is None else maps
+
+    snake_cells, snake_offsets = columns['snake_cells'].tolist(), columns['snake_offsets'].tolist()
+    free_cells, free_offsets = columns['free_cells'], columns['free_offsets'].tolist()
+    games = []
+    for i, (seed, size, counts, (policy, radius), direction, (hx, hy), score, ticks,
+            flags, cause, words, gauss) in enumerate(zip(
+                columns['seed'].tolist(), columns['grid_size'].tolist(),
+                columns['obstacle_count'].tolist(), columns['policy'].tolist(),
+                columns['direction'].tolist(), columns['human'].tolist(),
+                columns['score'].tolist(), columns['ticks'].tolist(),
+                columns['flags'].tolist(), columns['cause'].tolist(),
+                columns['rng_words'], columns['rng_gauss'].tolist())):
+        key = (seed, size, *counts)
+        game_map = maps.get(key)
+        if game_map is None:
+            obstacle_count = dict(zip(('mountain', 'tree', 'house', 'water'), counts))
+            game_map = maps[key] = generate_map(seed, size, obstacle_count)
+        game = SnakeGame(record_changes=record_changes, human_policy=make_policy(policy, radius),
+                         game_map=game_map)
+
+        cells = snake_cells[snake_offsets[i]:snake_offsets[i + 1]]
+        game.set_state({
+            'snake': [(cell % size, cell // size) for cell in cells],
+            'direction': DIRECTIONS[direction],
+            'human': None if hx < 0 else (hx, hy),
+            'score': score,
+            'game_over': bool(flags & GAME_OVER),
+            'win': bool(flags & WIN),
+            'paused': bool(flags & PAUSED),
+            'cause': cause or None,
+            'ticks': ticks,
+            'rng_state': (3, tuple(words.tolist()), gauss if flags & HAS_GAUSS else None),
+            'free': free_cells[free_offsets[i]:free_offsets[i + 1]]
+            if flags & HAS_FREE else None
+        })
+        games.append(game)
+    return games
+
+
+def save_snapshot(file, games):
+    """Write `games` to `file` (a path or binary file object) as an uncompressed .npz"""
+    np.savez(file, **capture(games))
+
+
+def load_snapshot(file, maps=None, record_changes=False):
+    with np.load(file) as data:
+        return restore({name: data[name] for name in data.files}, maps, record_changes)
+
+
+def snapshot(game):
+    """One game as bytes, in the same format as save_snapshot"""
+    out = io.BytesIO()
+    save_snapshot(out, [game])
+    return out.getvalue()
+
+
+def from_snapshot(data, maps=None, record_changes=False):
+    return load_snapshot(io.BytesIO(data), maps, record_changes)[0]
+
+
+class Checkpointer:
+    """Periodically saves a set of live games to one snapshot file.
+
+    Sessions `register` their game under a key on every rerun;
+    `checkpoint` captures all of them in one pass and writes the file
+    atomically (temporary file, then rename), so a crash mid-write keeps
+    the previous checkpoint. Games not registered again for `max_idle`
+    seconds are dropped, as their sessions have expired. After a restart,
+    `resume` reads the last checkpoint and `claim` hands each game back to
+    the session that owned it.
+
+    The capture runs under `lock`; callers that step games from other
+    threads should hold it while stepping so no game is captured mid-tick.
+    Only the capture holds the lock, not the file write.
+    """
+
+    def __init__(self, path, interval=5.0, max_idle=3600.0):
+        self.path = path
+        self.interval = interval
+        self.max_idle = max_idle
+        self.games = {}
+        self.seen = {}
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.last_seconds = 0.0
+        self._stop = None
+
+    def register(self, key, game):
+        require_single_player(game)
+        with self.lock:
+            self.games[key] = game
+            self.seen[key] = time.monotonic()
+
+    def unregister(self, key):
+        with self.lock:
+            self.games.pop(key, None)
+            self.seen.pop(key, None)
+
+    def resume(self, record_changes=False):
+        """Load the last checkpoint's games for `claim`; returns how many there were"""
+        if os.path.exists(self.path):
+            with np.load(self.path) as data:
+                keys = data['keys'].tolist()
+                games = restore({name: data[name] for name in data.files},
+                                record_changes=record_changes)
+            self.pending = dict(zip(keys, games))
+        return len(self.pending)
+
+    def claim(self, key):
+        """The game checkpointed under `key` before the restart, once (None if there is none)"""
+        with self.lock:
+            return self.pending.pop(key, None)
+
+    def checkpoint(self):
+        """Save every registered game now; returns how many were saved"""
+        start = time.perf_counter()
+        with self.lock:
+            cutoff = time.monotonic() - self.max_idle
+            for key in [key for key, seen in self.seen.items() if seen < cutoff]:
+                del self.games[key], self.seen[key]
+            keys = list(self.games)
+            columns = capture([self.games[key] for key in keys])
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, keys=np.array(keys, dtype=str), **columns)
+        os.replace(tmp, self.path)
+        self.last_seconds = time.perf_counter() - start
+        return len(keys)
+
+    def start(self):
+        """Checkpoint every `interval` seconds on a daemon thread"""
+        if self._stop is not None:
+            return
+        self._stop = threading.Event()
+        threading.Thread(target=self._run, args=(self._stop,), daemon=True,
+                         name="checkpointer").start()
+
+    def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
+
+    def _run(self, stop):
+        while not stop.wait(self.interval):
+            self.checkpoint()
@@ -0,0 +1,138 @@
+"""Self-play tournament: snake bots against the villager's escape logic.
+
+Plays every bot on the same seeded maps in worker processes and streams
+one JSON line per game, then prints win rates per bot to stderr:
+
+    python snake_tournament.py --games 20000 --bots greedy,path,cycle > results.jsonl
+    python snake_tournament.py --games 1000 --escape field --workers 8 --out results.jsonl
+
+Seeds are split into shards that workers pick up as they finish, so the
+run scales with the number of cores and needs no Streamlit server.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from snake_engine import GRID_SIZE, SnakeGame, generate_map
+from snake_ai import FieldEscape
+from snake_bots import BOTS
+
+ESCAPES = {
+    'greedy': lambda: None,
+    'field': FieldEscape
+}
+
+
+def play(bot, seed, grid_size=GRID_SIZE, escape='greedy', max_ticks=5000, game_map=None):
+    """Play one game of `bot` on the map for `seed`; returns its result row"""
+    game = SnakeGame(human_policy=ESCAPES[escape](),
+                     game_map=game_map or generate_map(seed, grid_size))
+    choose = bot.choose
+    step = game.step
+    while not step(choose(game)):
+        if game.ticks >= max_ticks:
+            break
+    return {
+        'bot': bot.name,
+        'seed': seed,
+        'score': game.score,
+        'ticks': game.ticks,
+        'win': game.win,
+        'game_over': game.game_over,
+        'cause': game.cause if game.game_over else None if game.win else 'timeout'
+    }
+
+
+def play_shard(bot_names, seeds, grid_size, escape, max_ticks):
+    """Every bot on every seed of one shard; each map is generated once"""
+    bots = [BOTS[name]() for name in bot_names]
+    rows = []
+    for seed in seeds:
+        game_map = generate_map(seed, grid_size)
+        for bot in bots:
+            rows.append(play(bot, seed, grid_size, escape, max_ticks, game_map))
+    return rows
+
+
+def shards(start, count, size):
+    for first in range(start, start + count, size):
+        yield range(first, min(first + size, start + count))
+
+
+def summarize(rows):
+    """Per-bot totals: games, wins, win rate, mean score and ticks, end causes"""
+    totals = defaultdict(lambda: {'games': 0, 'wins': 0, 'score': 0, 'ticks': 0, 'causes': Counter()})
+    for row in rows:
+        total = totals[row['bot']]
+        total['games'] += 1
+        total['wins'] += row['win']
+        total['score'] += row['score']
+        total['ticks'] += row['ticks']
+        if row['cause']:
+            total['causes'][row['cause']] += 1
+
+    summary = {}
+    for bot, total in sorted(totals.items()):
+        games = total['games']
+        summary[bot] = {
+            'games': games,
+            'wins': total['wins'],
+            'win_rate': total['wins'] / games,
+            'mean_score': total['score'] / games,
+            'mean_ticks': total['ticks'] / games,
+            'causes': dict(total['causes'].most_common())
+        }
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=1000, help="seeded maps to play")
+    parser.add_argument("--seed-start", type=int, default=0, help="first seed; seeds are consecutive")
+    parser.add_argument("--bots", default=",".join(BOTS), help=f"comma-separated, from {', '.join(BOTS)}")
+    parser.add_argument("--escape", choices=ESCAPES, default='greedy', help="villager escape policy")
+    parser.add_argument("--grid-size", type=int, default=GRID_SIZE)
+    parser.add_argument("--max-ticks", type=int, default=5000, help="games still running after this time out")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--shard-size", type=int, default=50, help="seeds per task")
+    parser.add_argument("--out", help="write JSONL here instead of stdout")
+    args = parser.parse_args(argv)
+
+    bot_names = args.bots.split(",")
+    unknown = [name for name in bot_names if name not in BOTS]
+    if unknown:
+        parser.error(f"unknown bots: {', '.join(unknown)}")
+
+    out = open(args.out, "w") if args.out else sys.stdout
+    rows = []
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = [pool.submit(play_shard, bot_names, seeds, args.grid_size, args.escape, args.max_ticks)
+                       for seeds in shards(args.seed_start, args.games, args.shard_size)]
+            for future in as_completed(futures):
+                for row in future.result():
+                    out.write(json.dumps(row) + "\n")
+                    rows.append(row)
+                out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(rows)} games in {elapsed:.1f}s ({len(rows) / elapsed:.0f} games/s, "
+          f"{args.workers} workers)", file=sys.stderr)
+    print(f"{'bot':10} {'games':>7} {'win rate':>9} {'score':>7} {'ticks':>8}  causes", file=sys.stderr)
+    for bot, total in summarize(rows).items():
+        causes = ", ".join(f"{cause} {n}" for cause, n in total['causes'].items())
+        print(f"{bot:10} {total['games']:>7} {total['win_rate']:>9.1%} {total['mean_score']:>7.1f} "
+              f"{total['mean_ticks']:>8.0f}  {causes}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+import random
+
+import numpy as np
+
+from snake_engine import (
+    SnakeGame, GRID_SIZE, CATCH_REWARD, WIN_SCORE, UP, DOWN, LEFT, RIGHT,
+    EMPTY, HUMAN, SNAKE_HEAD, SNAKE_BODY, HOUSE
+)
+
+# Action codes accepted by VecSnakeEnv.step; 0 keeps the current direction
+NOOP = 0
+ACTIONS = np.array([(0, 0), UP, DOWN, LEFT, RIGHT], dtype=np.int32)
+
+# Candidate human moves, in the order move_human tries them
+HUMAN_MOVES = np.array([(0, 1), (1, 0), (0, -1), (-1, 0)], dtype=np.int32)
+
+
+class VecSnakeEnv:
+    """N independent games stepped together with NumPy.
+
+    State lives in stacked arrays: `grid` (N, G, G) occupancy codes, a ring
+    buffer `body` (N, G*G) of packed `y*G+x` cells with `head_ptr`/`length`,
+    `head`, `direction`, `human` (x, y, or -1 when absent) and `score`.
+    `step` applies the same rules as SnakeGame.change_direction,
+    move_snake and move_human to every game at once and resets finished
+    games in place. Maps are drawn with SnakeGame, so they match the
+    single-game engine; the random streams of the two are not shared.
+    """
+
+    def __init__(self, num_envs, grid_size=GRID_SIZE, obstacle_count=None, seed=None):
+        self.num_envs = num_envs
+        self.grid_size = grid_size
+        self.obstacle_count = obstacle_count
+        self.capacity = grid_size * grid_size
+
+        self.grid = np.zeros((num_envs, grid_size, grid_size), dtype=np.uint8)
+        self.body = np.zeros((num_envs, self.capacity), dtype=np.int32)
+        self.head_ptr = np.zeros(num_envs, dtype=np.int32)
+        self.length = np.zeros(num_envs, dtype=np.int32)
+        self.head = np.zeros((num_envs, 2), dtype=np.int32)
+        self.direction = np.zeros((num_envs, 2), dtype=np.int32)
+        self.human = np.full((num_envs, 2), -1, dtype=np.int32)
+        self.score = np.zeros(num_envs, dtype=np.int32)
+        self.ticks = np.zeros(num_envs, dtype=np.int32)
+
+        self._env_index = np.arange(num_envs)
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """Draw a new map for every game"""
+        self.rng = np.random.default_rng(seed)
+        self._seed_rng = random.Random(seed)
+        for n in range(self.num_envs):
+            self._reset_env(n)
+
+    def _reset_env(self, n):
+        game = SnakeGame(self.grid_size, self.obstacle_count, seed=self._seed_rng.getrandbits(64))
+        size = self.grid_size
+        self.grid[n] = game.grid
+        cells = [y * size + x for x, y in game.snake]
+        self.body[n, :len(cells)] = cells
+        self.head_ptr[n] = 0
+        self.length[n] = len(cells)
+        self.head[n] = game.snake.head
+        self.direction[n] = game.direction
+        self.human[n] = game.human if game.human else (-1, -1)
+        self.score[n] = 0
+        self.ticks[n] = 0
+
+    def _spawn_human(self, n):
+        """Place a new human near a random house, else on any free cell"""
+        size = self.grid_size
+        interior = self.grid[n, 1:size-1, 1:size-1]
+        houses = np.argwhere(self.grid[n] == HOUSE)
+        if len(houses):
+            hy, hx = houses[self.rng.integers(len(houses))]
+            y0, x0 = max(1, hy - 3), max(1, hx - 3)
+            window = self.grid[n, y0:min(size-1, hy + 4), x0:min(size-1, hx + 4)]
+            free = np.argwhere(window == EMPTY)
+            if len(free):
+                y, x = free[self.rng.integers(len(free))] + (y0, x0)
+                return x, y
+        free = np.argwhere(interior == EMPTY)
+        if len(free):
+            y, x = free[self.rng.integers(len(free))] + 1
+            return x, y
+        return -1, -1
+
+    def step(self, actions):
+        """Advance every game one tick.
+
+        `actions` holds one action code per game (see ACTIONS). Returns
+        `(rewards, dones, info)`; `info` carries the final `score`, `win`
+        and `game_over` of games that finished this tick, which have
+        already been reset.
+        """
+        size = self.grid_size
+        idx = self._env_index
+        grid = self.grid
+
+        # change_direction: ignore no-ops and 180-degree turns
+        wanted = ACTIONS[np.asarray(actions)]
+        turn = (wanted != 0).any(axis=1) & (wanted != -self.direction).any(axis=1)
+        self.direction[turn] = wanted[turn]
+
+        # move_snake: collisions against bounds, landscape and the whole body
+        new_head = self.head + self.direction
+        nx, ny = new_head[:, 0], new_head[:, 1]
+        in_bounds = (nx >= 0) & (nx < size) & (ny >= 0) & (ny < size)
+        cx, cy = np.clip(nx, 0, size-1), np.clip(ny, 0, size-1)
+        game_over = ~in_bounds | (grid[idx, cy, cx] >= SNAKE_HEAD)
+        alive = ~game_over
+        a = idx[alive]
+
+        hx, hy = self.head[a, 0], self.head[a, 1]
+        grid[a, hy, hx] = SNAKE_BODY
+        grid[a, ny[a], nx[a]] = SNAKE_HEAD
+        self.head[a] = new_head[a]
+        self.head_ptr[a] = (self.head_ptr[a] - 1) % self.capacity
+        self.body[a, self.head_ptr[a]] = ny[a] * size + nx[a]
+        self.length[a] += 1
+        self.ticks[a] += 1
+
+        caught = alive & (nx == self.human[:, 0]) & (ny == self.human[:, 1])
+        rewards = np.where(caught, CATCH_REWARD, 0).astype(np.int32)
+        self.score += rewards
+        win = caught & (self.score >= WIN_SCORE)
+
+        # Tail moves up unless the snake just ate
+        t = idx[alive & ~caught]
+        tail_ptr = (self.head_ptr[t] + self.length[t] - 1) % self.capacity
+        tail = self.body[t, tail_ptr]
+        grid[t, tail // size, tail % size] = EMPTY
+        self.length[t] -= 1
+
+        for n in np.flatnonzero(caught & ~win):
+            x, y = self.human[n] = self._spawn_human(n)
+            if x >= 0:
+                grid[n, y, x] = HUMAN
+
+        # move_human: 30% of the time, step to the valid neighbour that
+        # keeps the largest squared distance from the head (ties go to the
+        # first move in HUMAN_MOVES)
+        movers = alive & ~win & (self.human[:, 0] >= 0) & (self.rng.random(self.num_envs) <= 0.3)
+        m = idx[movers]
+        if len(m):
+            self._move_humans(m)
+
+        dones = game_over | win
+        info = {
+            'score': np.where(dones, self.score, 0),
+            'win': win,
+            'game_over': game_over
+        }
+        for n in np.flatnonzero(dones):
+            self._reset_env(n)
+        return rewards, dones, info
+
+    def _move_humans(self, m):
+        size = self.grid_size
+        grid = self.grid
+        human = self.human[m]
+        head = self.head[m]
+        old_dist = ((head - human) ** 2).sum(axis=1)
+
+        candidates = human[:, None, :] + HUMAN_MOVES[None, :, :]
+        cx, cy = candidates[..., 0], candidates[..., 1]
+        interior = (cx > 0) & (cx < size-1) & (cy > 0) & (cy < size-1)
+        codes = grid[m[:, None], np.clip(cy, 0, size-1), np.clip(cx, 0, size-1)]
+        new_dist = ((head[:, None, :] - candidates) ** 2).sum(axis=2)
+        ok = interior & (codes == EMPTY) & (new_dist >= old_dist[:, None])
+
+        scores = np.where(ok, new_dist, -1)
+        best = scores.argmax(axis=1)
+        moved = ok[np.arange(len(m)), best]
+        m, human, best = m[moved], human[moved], best[moved]
+        target = human + HUMAN_MOVES[best]
+
+        # A human spawned on top of an obstacle leaves the obstacle behind
+        was_marked = grid[m, human[:, 1], human[:, 0]] == HUMAN
+        grid[m[was_marked], human[was_marked, 1], human[was_marked, 0]] = EMPTY
+        grid[m, target[:, 1], target[:, 0]] = HUMAN
+        self.human[m] = target
@@ -0,0 +1,320 @@
+import random
+import struct
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+from snake_engine import (
+    SnakeBody, INITIAL_SNAKE_LENGTH, CATCH_REWARD, WIN_SCORE, RIGHT,
+    EMPTY, HUMAN, SNAKE_HEAD, SNAKE_BODY, BOUNDARY, LANDSCAPE_CODES, COLLISION_CAUSES,
+    free_in_box, new_seed
+)
+
+CHUNK_SIZE = 16
+
+# Landscape per chunk; about the density of the default 30x30 map
+CHUNK_OBSTACLES = {
+    'mountain': 1,
+    'tree': 5,
+    'house': 3,
+    'water': 3
+}
+
+_CHUNK_HEADER = struct.Struct("<iiB")
+
+
+def chunk_rng(seed, cx, cy):
+    """The random stream of one chunk, fixed by the world seed and its position"""
+    return random.Random(f"{seed}:{cx}:{cy}")
+
+
+def generate_chunk_landscape(rng, grid, obstacle_count=None):
+    """Generate landscape into one chunk's `grid`.
+
+    A chunk-sized version of snake_engine.generate_landscape: trees, houses
+    and water are sampled without replacement from small boxes around
+    random cluster centres, mountains from anywhere in the chunk. Only
+    empty cells are used, so world-edge boundary cells are kept.
+    """
+    obstacle_count = obstacle_count or CHUNK_OBSTACLES
+    size = grid.shape[0]
+
+    def place(kind, region, count):
+        code = LANDSCAPE_CODES[kind]
+        for cell in rng.sample(region, min(count, len(region))):
+            grid[cell // size, cell % size] = code
+
+    def cluster(spread):
+        x, y = rng.randrange(size), rng.randrange(size)
+        return free_in_box(grid, max(0, x - spread), max(0, y - spread),
+                           min(size - 1, x + spread), min(size - 1, y + spread))
+
+    place('mountains', free_in_box(grid, 0, 0, size - 1, size - 1), obstacle_count['mountain'])
+    place('trees', cluster(3), obstacle_count['tree'])
+    place('houses', cluster(2), obstacle_count['house'])
+    place('water', cluster(2), obstacle_count['water'])
+
+
+class Chunk:
+    """One CHUNK_SIZE x CHUNK_SIZE piece of the world's landscape"""
+
+    __slots__ = ('cx', 'cy', 'grid')
+
+    def __init__(self, cx, cy, grid):
+        self.cx = cx
+        self.cy = cy
+        self.grid = grid
+
+    def to_bytes(self):
+        """Position plus the zlib-compressed cell codes, typically well under 100 bytes"""
+        return _CHUNK_HEADER.pack(self.cx, self.cy, self.grid.shape[0]) + zlib.compress(self.grid.tobytes(), 6)
+
+    @classmethod
+    def from_bytes(cls, data):
+        cx, cy, size = _CHUNK_HEADER.unpack_from(data)
+        codes = zlib.decompress(data[_CHUNK_HEADER.size:])
+        return cls(cx, cy, np.frombuffer(codes, dtype=np.uint8).reshape(size, size).copy())
+
+
+class World:
+    """A large map made of chunks that exist only near the snake.
+
+    The world is `width` chunks wide and tall, with a boundary around its
+    edge. Chunks are generated on first use from the world seed and their
+    position, so the same seed always gives the same world however it is
+    explored. At most `max_loaded` chunks are kept as arrays; chunks
+    evicted from there are archived as compressed bytes (up to
+    `max_archived`) and restored from those instead of being generated
+    again. Snake cells are packed into 32 bits, which caps the world at
+    65536 cells a side.
+    """
+
+    def __init__(self, seed=None, width=256, chunk_size=CHUNK_SIZE, obstacle_count=None,
+                 max_loaded=64, max_archived=4096):
+        if width * chunk_size > 65536:
+            raise ValueError(f"worlds are at most 65536 cells wide, not {width * chunk_size}")
+        self.seed = new_seed() if seed is None else seed
+        self.width = width
+        self.chunk_size = chunk_size
+        self.size = width * chunk_size
+        self.obstacle_count = obstacle_count or CHUNK_OBSTACLES
+        self.max_loaded = max_loaded
+        self.max_archived = max_archived
+        self.loaded = OrderedDict()
+        self.archived = OrderedDict()
+        self.generated = 0
+
+    def chunk(self, cx, cy):
+        """The chunk at chunk coordinates (cx, cy), loading it if needed"""
+        key = (cx, cy)
+        chunk = self.loaded.get(key)
+        if chunk is not None:
+            self.loaded.move_to_end(key)
+            return chunk
+
+        data = self.archived.pop(key, None)
+        chunk = Chunk.from_bytes(data) if data is not None else self._generate(cx, cy)
+        self.loaded[key] = chunk
+        while len(self.loaded) > self.max_loaded:
+            old_key, old = self.loaded.popitem(last=False)
+            self.archived[old_key] = old.to_bytes()
+            if len(self.archived) > self.max_archived:
+                self.archived.popitem(last=False)
+        return chunk
+
+    def _generate(self, cx, cy):
+        size = self.chunk_size
+        grid = np.zeros((size, size), dtype=np.uint8)
+        last = self.width - 1
+        if cx == 0:
+            grid[:, 0] = BOUNDARY
+        if cx == last:
+            grid[:, -1] = BOUNDARY
+        if cy == 0:
+            grid[0, :] = BOUNDARY
+        if cy == last:
+            grid[-1, :] = BOUNDARY
+        generate_chunk_landscape(chunk_rng(self.seed, cx, cy), grid, self.obstacle_count)
+        self.generated += 1
+        return Chunk(cx, cy, grid)
+
+    def code(self, x, y):
+        """Landscape code at world cell (x, y); BOUNDARY outside the world"""
+        if not (0 <= x < self.size and 0 <= y < self.size):
+            return BOUNDARY
+        size = self.chunk_size
+        return self.chunk(x // size, y // size).grid[y % size, x % size]
+
+    def region(self, x0, y0, width, height):
+        """Landscape codes of a rectangle as a (height, width) array.
+
+        Copies whole-chunk slices, so the cost depends on the rectangle,
+        not on the world. Cells outside the world are BOUNDARY.
+        """
+        out = np.full((height, width), BOUNDARY, dtype=np.uint8)
+        size = self.chunk_size
+        gx0, gy0 = max(x0, 0), max(y0, 0)
+        gx1, gy1 = min(x0 + width, self.size), min(y0 + height, self.size)
+        for cy in range(gy0 // size, (gy1 - 1) // size + 1 if gy1 > gy0 else 0):
+            for cx in range(gx0 // size, (gx1 - 1) // size + 1 if gx1 > gx0 else 0):
+                grid = self.chunk(cx, cy).grid
+                ax0, ay0 = max(gx0, cx * size), max(gy0, cy * size)
+                ax1, ay1 = min(gx1, (cx + 1) * size), min(gy1, (cy + 1) * size)
+                out[ay0 - y0:ay1 - y0, ax0 - x0:ax1 - x0] = \
+                    grid[ay0 - cy * size:ay1 - cy * size, ax0 - cx * size:ax1 - cx * size]
+        return out
+
+
+class WorldGame:
+    """Snake on a chunked World, with the rules of snake_engine.SnakeGame.
+
+    Only the chunks around the snake are ever generated: `load_radius`
+    chunks around the head's chunk are loaded whenever the head enters a
+    new chunk, and the world evicts chunks it has not touched for longest.
+    The snake's cells are tracked in a set, so no per-tick work depends on
+    the world's size. The villager spawns within `spawn_radius` cells of
+    the head and flees with the engine's greedy rule.
+    """
+
+    def __init__(self, seed=None, width=256, load_radius=2, spawn_radius=12, world=None):
+        self.world = world or World(seed, width)
+        self.seed = self.world.seed
+        self.load_radius = load_radius
+        self.spawn_radius = spawn_radius
+        self.reset()
+
+    def reset(self):
+        world = self.world
+        self.rng = chunk_rng(self.seed, 'game', 0)
+        centre = world.size // 2
+        cells = [(centre - i, centre) for i in range(INITIAL_SNAKE_LENGTH + 1)]
+        self._load_around(centre, centre)
+
+        # Start on the first free stretch of the centre row
+        while any(world.code(x, y) != EMPTY for x, y in cells):
+            cells = [(x + 1, y) for x, y in cells]
+        self.snake = SnakeBody(cells[1:], world.size)
+        self.occupied = set(cells[1:])
+        self.direction = RIGHT
+        self.score = 0
+        self.ticks = 0
+        self.game_over = False
+        self.cause = None
+        self.win = False
+        self.paused = False
+        self.human = None
+        self.human = self.generate_human()
+        return self
+
+    @property
+    def done(self):
+        return self.game_over or self.win
+
+    def _load_around(self, x, y):
+        size = self.world.chunk_size
+        cx, cy = x // size, y // size
+        r = self.load_radius
+        for ny in range(max(cy - r, 0), min(cy + r, self.world.width - 1) + 1):
+            for nx in range(max(cx - r, 0), min(cx + r, self.world.width - 1) + 1):
+                self.world.chunk(nx, ny)
+
+    def is_free(self, x, y):
+        return (x, y) not in self.occupied and (x, y) != self.human and self.world.code(x, y) == EMPTY
+
+    def generate_human(self):
+        """A free cell near the head (None if none was found)"""
+        head_x, head_y = self.snake.head
+        r = self.spawn_radius
+        for _ in range(100):
+            x = head_x + self.rng.randint(-r, r)
+            y = head_y + self.rng.randint(-r, r)
+            if abs(x - head_x) + abs(y - head_y) > 3 and self.is_free(x, y):
+                return (x, y)
+        return None
+
+    def move_human(self):
+        """Greedy escape, as SnakeGame.move_human without a policy"""
+        if not self.human or self.rng.random() > 0.3:
+            return
+        hx, hy = self.human
+        head_x, head_y = self.snake.head
+        old_dist = (head_x - hx) ** 2 + (head_y - hy) ** 2
+        best, best_dist = None, None
+        for dx, dy in ((0, 1), (1, 0), (0, -1), (-1, 0)):
+            x, y = hx + dx, hy + dy
+            if self.is_free(x, y):
+                dist = (head_x - x) ** 2 + (head_y - y) ** 2
+                if dist >= old_dist and (best is None or dist > best_dist):
+                    best, best_dist = (x, y), dist
+        if best:
+            self.human = best
+
+    def move_snake(self):
+        if self.paused or self.game_over or self.win:
+            return
+        head_x, head_y = self.snake.head
+        new_head = (head_x + self.direction[0], head_y + self.direction[1])
+
+        # The tail still occupies its cell, as in SnakeGame
+        if new_head in self.occupied:
+            self.game_over = True
+            self.cause = 'self'
+            return
+        code = self.world.code(*new_head)
+        if code >= SNAKE_HEAD:
+            self.game_over = True
+            self.cause = COLLISION_CAUSES[code]
+            return
+
+        size = self.world.chunk_size
+        if (new_head[0] // size, new_head[1] // size) != (head_x // size, head_y // size):
+            self._load_around(*new_head)
+
+        self.snake.push_head(new_head)
+        self.occupied.add(new_head)
+        self.ticks += 1
+        if new_head == self.human:
+            self.score += CATCH_REWARD
+            if self.score >= WIN_SCORE:
+                self.win = True
+                return
+            self.human = self.generate_human()
+        else:
+            self.occupied.discard(self.snake.pop_tail())
+        self.move_human()
+
+    def change_direction(self, new_direction):
+        """Turn the snake, ignoring 180-degree reversals"""
+        if new_direction[0] != -self.direction[0] or new_direction[1] != -self.direction[1]:
+            self.direction = new_direction
+
+    def toggle_pause(self):
+        self.paused = not self.paused
+
+    def step(self, action=None):
+        """Apply an optional direction and advance one tick; returns `done`"""
+        if action is not None:
+            self.change_direction(action)
+        self.move_snake()
+        return self.done
+
+    def viewport(self, width=30, height=30):
+        """Cell codes of the `width` x `height` window centred on the head.
+
+        The camera stops at the world's edge. Returns the codes (snake and
+        villager included) and the window's top-left world cell.
+        """
+        head_x, head_y = self.snake.head
+        x0 = min(max(head_x - width // 2, 0), max(self.world.size - width, 0))
+        y0 = min(max(head_y - height // 2, 0), max(self.world.size - height, 0))
+        codes = self.world.region(x0, y0, width, height)
+        for x, y in self.snake.body():
+            if x0 <= x < x0 + width and y0 <= y < y0 + height:
+                codes[y - y0, x - x0] = SNAKE_BODY
+        if self.human:
+            x, y = self.human
+            if x0 <= x < x0 + width and y0 <= y < y0 + height:
+                codes[y - y0, x - x0] = HUMAN
+        codes[head_y - y0, head_x - x0] = SNAKE_HEAD
+        return codes, (x0, y0)
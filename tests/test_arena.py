@@ -0,0 +1,27 @@
+import pytest
+
+from snake_arena import ArenaGame
+from snake_engine import EMPTY
+from snake_replay import ReplayRecorder
+from snake_snapshot import capture
+
+NO_HOUSES = {'mountain': 10, 'tree': 20, 'house': 0, 'water': 15}
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_free_cells_match_the_grid_after_reset(seed):
+    game = ArenaGame(range(3), obstacle_count=NO_HOUSES, seed=seed)
+    size = game.grid_size
+    interior = game.grid[1:size - 1, 1:size - 1]
+    expected = {(y + 1) * size + x + 1 for y, x in zip(*(interior == EMPTY).nonzero())}
+    assert set(game.free_cells()) == expected
+
+
+def test_arena_games_are_refused_by_replays_and_snapshots():
+    game = ArenaGame(range(2), seed=1)
+    with pytest.raises(TypeError):
+        ReplayRecorder(game)
+    with pytest.raises(TypeError):
+        capture([game])
+    with pytest.raises(TypeError, match="arena games cannot be recorded or snapshotted"):
+        game.get_state()
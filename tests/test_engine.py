@@ -0,0 +1,31 @@
+import random
+
+import pytest
+
+import snake_engine as se
+
+
+def unrepaired_map(seed, grid_size, scale):
+    """A grid and start cells as generate_map has them just before the repair"""
+    rng = random.Random(seed)
+    grid = se.boundary_grid(grid_size).copy()
+    start = se.initial_snake(grid_size)
+    for x, y in start:
+        grid[y, x] = se.SNAKE_BODY
+    counts = {kind: count * scale for kind, count in se.OBSTACLE_COUNT.items()}
+    landscape = se.generate_landscape(rng, grid, counts)
+    head_x, head_y = start[0]
+    start.insert(0, (head_x + 1, head_y))
+    return grid, start, [cell for cells in landscape.values() for cell in cells.cells]
+
+
+@pytest.mark.parametrize("grid_size,scale", [(30, 1), (30, 4), (72, 4), (100, 8), (128, 16)])
+def test_landscape_pockets_match_the_full_flood(grid_size, scale):
+    for seed in range(40):
+        grid, start, cells = unrepaired_map(seed, grid_size, scale)
+        x, y = start[0]
+        if grid[y, x] != se.EMPTY:
+            # repair_landscape clears the first move before looking for pockets
+            continue
+        expected = sorted(se.pocket_cells(grid, start))
+        assert sorted(se._landscape_pockets(grid, start, cells)) == expected, seed
@@ -0,0 +1,24 @@
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from snake_engine import generate_map
+from snake_maps import MapPool
+
+
+def test_unpickled_maps_get_their_own_id():
+    game_map = generate_map(1)
+    copy = pickle.loads(pickle.dumps(game_map))
+    assert copy.map_id != game_map.map_id
+    assert (copy.grid == game_map.grid).all() and copy.rng_state == game_map.rng_state
+
+
+def test_maps_from_worker_processes_have_distinct_ids():
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        pool = MapPool(per_config=4, executor=executor)
+        pool.warm()
+        deadline = time.monotonic() + 30
+        while pool.ready_count() < 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        maps = [pool.pop() for _ in range(4)]
+    assert len({game_map.map_id for game_map in maps}) == len(maps)
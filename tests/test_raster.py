@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from snake_bots import Autopilot
+from snake_engine import SnakeGame
+from snake_raster import Rasterizer, save_gif
+from snake_replay import Replay, ReplayRecorder
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def recorded_replay(seed=3, ticks=40):
+    game = SnakeGame(seed=seed)
+    recorder = ReplayRecorder(game)
+    pilot = Autopilot()
+    for _ in range(ticks):
+        if recorder.step(pilot.choose(game)):
+            break
+    return Replay(recorder.to_bytes())
+
+
+def test_replay_gif_has_a_frame_per_tick(tmp_path):
+    replay = recorded_replay()
+    rasterizer = Rasterizer(cell=4)
+    path = tmp_path / "replay.gif"
+
+    count = save_gif(rasterizer.replay_frames(replay), path)
+
+    assert count == len(replay) + 1
+    with Image.open(path) as gif:
+        assert gif.n_frames == len(replay) + 1
+        # The first frame is the start of the game, not the last board
+        assert (np.asarray(gif) == rasterizer.frame(replay.seek(0).grid)).all()
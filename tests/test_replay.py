@@ -0,0 +1,29 @@
+import pytest
+
+from snake_engine import SnakeGame, UP, LEFT
+from snake_replay import VERSION, Replay, ReplayRecorder
+
+
+def test_two_turns_between_ticks_replay_exactly():
+    # Going right, UP then LEFT before one tick turns the snake left, which
+    # is not a turn change_direction would allow from RIGHT on replay
+    game = SnakeGame(seed=5)
+    recorder = ReplayRecorder(game)
+    game.change_direction(UP)
+    game.change_direction(LEFT)
+    for _ in range(20):
+        if recorder.step():
+            break
+
+    replay = Replay(recorder.to_bytes())
+    simulated = replay.simulate()
+    assert simulated.get_state()['snake'] == game.get_state()['snake']
+    assert (simulated.game_over, simulated.cause) == (game.game_over, game.cause)
+    assert replay.verify()
+
+
+def test_older_versions_are_rejected():
+    data = bytearray(ReplayRecorder(SnakeGame(seed=5)).to_bytes())
+    data[4] = VERSION - 1
+    with pytest.raises(ValueError, match="unsupported replay version"):
+        Replay(bytes(data))
@@ -0,0 +1,24 @@
+from snake_server import GameServer, LocalClient, MAX_SEATS
+
+
+def test_bad_seats_get_an_error_reply():
+    server = GameServer()
+    client = LocalClient(server)
+    client.join("room", seats="lots")
+    client.receive_pending()
+    assert client.state['type'] == 'error'
+    assert client.room is None and not server.rooms
+
+
+def test_seats_are_capped():
+    server = GameServer()
+    LocalClient(server).join("room", seats=2000)
+    assert server.rooms["room"].capacity == MAX_SEATS
+
+
+def test_rejoining_removes_the_empty_room():
+    server = GameServer()
+    client = LocalClient(server)
+    for i in range(5):
+        client.join(f"room-{i}")
+    assert list(server.rooms) == ["room-4"]
@@ -0,0 +1,21 @@
+from snake_bots import Autopilot
+from snake_engine import SnakeGame
+from snake_replay import Replay, ReplayRecorder
+from snake_snapshot import snapshot, from_snapshot
+
+
+def test_replay_of_a_restored_game_verifies():
+    game = SnakeGame(seed=7)
+    pilot = Autopilot()
+    for _ in range(16):
+        game.step(pilot.choose(game))
+
+    restored = from_snapshot(snapshot(game))
+    recorder = ReplayRecorder(restored)
+    for _ in range(40):
+        if recorder.step(pilot.choose(restored)):
+            break
+
+    replay = Replay(recorder.to_bytes())
+    assert replay.simulate().get_state() == restored.get_state()
+    assert replay.verify()